@@ -0,0 +1,96 @@
+from functools import reduce
+
+import numpy as np
+
+from src.corpus import Corpus
+
+# Bitsets are only built if they take at most this many bytes, see bitsets_fit()
+BITSET_MAX_BYTES = 1 << 29
+
+
+if hasattr(int, "bit_count"):
+    def popcount(bitset):
+        """
+        :param bitset: bitset as Python int
+        :return: amount of set bits
+        """
+        return bitset.bit_count()
+else:
+    # Python < 3.10
+    def popcount(bitset):
+        """
+        :param bitset: bitset as Python int
+        :return: amount of set bits
+        """
+        return bin(bitset).count("1")
+
+
+def bitsets_fit(amount_sets, universe_size, max_bytes=BITSET_MAX_BYTES):
+    """
+    Every bitset spans the whole universe, so the bitsets of a collection take about
+    amount_sets * universe_size / 8 bytes, however small the sets are.
+    :param amount_sets: number of sets
+    :param universe_size: number of elements
+    :param max_bytes: memory limit
+    :return: True if the bitsets of such a collection take at most max_bytes
+    """
+    return amount_sets * ((universe_size + 63) // 64) * 8 <= max_bytes
+
+
+def to_bitsets(sets, max_bytes=BITSET_MAX_BYTES):
+    """
+    Pack every set of a collection into a bitset over the interned universe: bit j of the bitset of a set is 1
+    if it contains the element with ID j. The bitsets are Python ints, so union, intersection and difference
+    work word by word (a | b, a & b, a & ~b) and popcount() gives their size.
+
+    Example:
+
+    sets = [{'A', 'B'}, {'B', 'C'}, {'C'}]   (IDs: A=0, B=1, C=2)
+    to_bitsets(sets) = [0b011, 0b110, 0b100]
+
+    :param sets: collection of sets (list of sets or Corpus); a list of sets is interned into a Corpus first
+    :param max_bytes: memory limit, see bitsets_fit()
+    :return: list of bitsets, one per set; None if they do not fit into max_bytes
+    """
+    corpus = sets if isinstance(sets, Corpus) else Corpus.from_sets(sets)
+    if not bitsets_fit(len(corpus), corpus.universe_size, max_bytes):
+        return None
+
+    print("Packing the sets into bitsets...")
+    amount_bytes = (corpus.universe_size + 7) // 8
+    bitsets = list()
+    for set_i in range(len(corpus)):
+        ids = corpus.set_ids(set_i)
+        packed = np.zeros(amount_bytes, dtype=np.uint8)
+        np.bitwise_or.at(packed, ids >> 3, np.left_shift(1, ids & 7).astype(np.uint8))
+        bitsets.append(int.from_bytes(packed.tobytes(), "little"))
+    return bitsets
+
+
+def bitset_elements(bitset):
+    """
+    :param bitset: bitset as Python int
+    :return: int64 array of the IDs of its elements (the positions of the set bits), ascending
+    """
+    packed = np.frombuffer(bitset.to_bytes((bitset.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder="little"))
+
+
+def union_bitset(bitsets, set_indices=None):
+    """
+    :param bitsets: list of bitsets, see to_bitsets()
+    :param set_indices: iterable of indices of the bitsets to unite; all if None
+    :return: the union as bitset, e.g. the covered elements of a solution
+    """
+    if set_indices is not None:
+        bitsets = (bitsets[set_i] for set_i in set_indices)
+    return reduce(lambda a, b: a | b, bitsets, 0)
+
+
+def residual_size(bitset, covered):
+    """
+    :param bitset: bitset of a set Si
+    :param covered: bitset of the covered elements C
+    :return: | Si \\ C |
+    """
+    return popcount(bitset & ~covered)
@@ -0,0 +1,92 @@
+from src.postprocesses import remove_redundant_sets
+from src.preprocesses import build_inverted_index, compute_coverage_target, compute_set_lengths
+
+
+def bucket_greedy(sets, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
+    """
+    The classic greedy algorithm for the set cover problem (see also lazy_greedy()) in O(total size of all sets).
+
+    Since every set costs the same, the marginal gain of a set is its residual size |Si \\ C|, a small integer
+    bounded by the size of the largest set. The sets are kept in buckets indexed by their residual size.
+    Whenever an element gets covered, each set containing it (found via the inverted index) is moved one
+    bucket down. The next set to select is taken from the highest non-empty bucket, whose index never grows.
+    Ties between sets of the same residual size are broken arbitrarily.
+
+    :param sets: collection of sets (list of sets or Corpus); only read
+    :param target_coverage: fraction of the elements that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: solution set containing a sub-collection of indices of sets; <class 'set'>
+    """
+
+    # List of important variables, constants and lists:
+    #
+    # inverted_index    (1)     defaultdict(<class 'list'>) Example: {'F': [1, 2], 'G': [1, 2, 3, 4], 'H': [4, 5]}
+    # residual_sizes    (2)     <class 'list'>  |Si \ C| for each set i; 0 for selected sets
+    # buckets           (3)     <class 'list'>  containing 'set's; buckets[r] holds the sets with residual size r
+
+    print("+---------------+")
+    print("| Bucket Greedy |")
+    print("+---------------+\n")
+
+    """
+    Initialization & Pre-processes
+    """
+    print("Initialization.")
+
+    solution_indices = set()
+    covered_elements = set()
+
+    inverted_index = build_inverted_index(sets, print_output=False)    # (1)
+    residual_sizes = compute_set_lengths(sets)                          # (2)
+    target_elements = compute_coverage_target(len(inverted_index), target_coverage)
+
+    max_size = max(residual_sizes) if residual_sizes else 0
+    buckets = [set() for _ in range(max_size + 1)]                      # (3)
+    for set_i in range(len(residual_sizes)):
+        if residual_sizes[set_i] > 0:
+            buckets[residual_sizes[set_i]].add(set_i)
+
+    """
+    Main Algorithm
+    """
+    print("\nLoop.")
+    r = max_size
+    while r > 0:
+        if len(covered_elements) >= target_elements or (max_sets is not None and len(solution_indices) >= max_sets):
+            break
+        if len(buckets[r]) == 0:
+            r -= 1
+            continue
+
+        # A set with the largest residual size
+        set_i = buckets[r].pop()
+        solution_indices.add(set_i)
+        residual_sizes[set_i] = 0
+
+        for element in sets[set_i]:
+            if element in covered_elements:
+                continue
+            covered_elements.add(element)
+
+            # Every other unselected set containing the element loses it: move it one bucket down
+            for set_j in inverted_index[element]:
+                size = residual_sizes[set_j]
+                if size == 0:
+                    continue
+                buckets[size].remove(set_j)
+                if size > 1:
+                    buckets[size - 1].add(set_j)
+                residual_sizes[set_j] = size - 1
+
+    if print_logs:
+        print("Amount of indices in Bucket-Greedy-Solution: ", len(solution_indices))
+        print("Covered elements: ", len(covered_elements))
+
+    if remove_redundant is not None:
+        solution_indices, _ = remove_redundant_sets(sets, solution_indices, remove_redundant, print_logs=print_logs)
+
+    return solution_indices
@@ -0,0 +1,232 @@
+import json
+import os
+from array import array
+
+import numpy as np
+
+# Bump whenever the on-disk layout written by save_corpus() changes
+CORPUS_FORMAT_VERSION = 1
+
+
+class Corpus(object):
+    """
+    Compact representation of a collection of sets (e.g. sets_universe).
+
+    Every word is interned into a vocabulary and replaced by its int32 ID. All sets are stored
+    CSR-style in one flat element array, the elements of set i are
+        elements[offsets[i]:offsets[i+1]]
+    with the IDs of each set sorted ascending.
+
+    A Corpus behaves like a read-only list of sets: len(corpus) is the number of sets and
+    corpus[i] returns the i-th set as frozenset of word IDs. Hence it can be handed to the
+    functions in src/preprocesses.py and to the solvers instead of a list of sets.
+
+    Example:
+
+    sets = [{'A', 'B'}, {'B', 'C'}, {'C'}]
+    vocabulary = ['A', 'B', 'C']
+    offsets    = [0, 2, 4, 5]
+    elements   = [0, 1, 1, 2, 2]
+
+    """
+
+    def __init__(self, vocabulary, offsets, elements):
+        """
+        :param vocabulary: list of words; the position of a word is its ID
+        :param offsets: int64 array of length len(corpus)+1 containing the start of each set in elements
+        :param elements: int32 array containing the word IDs of all sets one after another
+        """
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.elements = elements
+        self._word_ids = None
+
+    @classmethod
+    def from_sets(cls, set_collection, universe=None, print_logs=True):
+        """
+        Intern a collection of sets of words into a Corpus.
+        :param set_collection: collection of sets, e.g. sets_universe
+        :param universe: optional set of all elements, e.g. wds_universe; its words get the lowest IDs
+                         (sorted), so words which are not contained in any set still get an ID
+        :param print_logs: prints a progress message
+        :return: the Corpus
+        """
+        if print_logs:
+            print("Interning words and building the array-backed corpus...")
+        vocabulary = sorted(universe) if universe is not None else list()
+        word_ids = {word: i for i, word in enumerate(vocabulary)}
+
+        offsets = array('q', [0])
+        elements = array('i')
+        for set_i in set_collection:
+            ids = list()
+            for word in set_i:
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = len(vocabulary)
+                    word_ids[word] = word_id
+                    vocabulary.append(word)
+                ids.append(word_id)
+            ids.sort()
+            elements.extend(ids)
+            offsets.append(len(elements))
+
+        corpus = cls(vocabulary,
+                     np.frombuffer(offsets, dtype=np.int64),
+                     np.frombuffer(elements, dtype=np.int32))
+        corpus._word_ids = word_ids
+        return corpus
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return frozenset(self.set_ids(i).tolist())
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def word_ids(self):
+        """
+        Dict mapping each word to its ID; built on first use.
+        """
+        if self._word_ids is None:
+            self._word_ids = {word: i for i, word in enumerate(self.vocabulary)}
+        return self._word_ids
+
+    @property
+    def universe_size(self):
+        return len(self.vocabulary)
+
+    @property
+    def nbytes(self):
+        """
+        Memory occupied by the offsets and element arrays in bytes.
+        """
+        return self.offsets.nbytes + self.elements.nbytes
+
+    def set_ids(self, i):
+        """
+        :param i: index of a set
+        :return: the sorted word IDs of set i as int32 array (a view, no copy)
+        """
+        if i < 0:
+            i += len(self)
+        return self.elements[self.offsets[i]:self.offsets[i + 1]]
+
+    def set_lengths(self):
+        """
+        :return: int64 array containing the length of each set
+        """
+        return np.diff(self.offsets)
+
+    def universe(self):
+        """
+        :return: set of all word IDs; the interned counterpart of wds_universe
+        """
+        return set(range(len(self.vocabulary)))
+
+    def encode(self, words):
+        """
+        :param words: iterable of words
+        :return: set of the corresponding word IDs
+        """
+        return {self.word_ids[word] for word in words}
+
+    def decode(self, ids):
+        """
+        :param ids: iterable of word IDs
+        :return: set of the corresponding words
+        """
+        return {self.vocabulary[i] for i in ids}
+
+    def select(self, set_indices):
+        """
+        :param set_indices: iterable of indices of sets
+        :return: a Corpus of these sets in the given order, with the same vocabulary (and word IDs)
+        """
+        set_indices = np.fromiter(set_indices, dtype=np.int64)
+        lengths = self.offsets[set_indices + 1] - self.offsets[set_indices]
+        offsets = np.zeros(len(set_indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        elements = np.concatenate([self.set_ids(i) for i in set_indices]) if len(set_indices) else np.zeros(0, dtype=np.int32)
+        corpus = Corpus(self.vocabulary, offsets, elements.astype(np.int32, copy=False))
+        corpus._word_ids = self._word_ids
+        return corpus
+
+    def restrict(self, element_ids):
+        """
+        :param element_ids: iterable of word IDs
+        :return: a Corpus of the same sets, each restricted to the given word IDs, with the same vocabulary
+        """
+        keep = np.zeros(len(self.vocabulary), dtype=bool)
+        keep[np.fromiter(element_ids, dtype=np.int64)] = True
+        kept = keep[self.elements]
+        set_numbers = np.repeat(np.arange(len(self)), self.set_lengths())
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(set_numbers[kept], minlength=len(self)), out=offsets[1:])
+        corpus = Corpus(self.vocabulary, offsets, self.elements[kept])
+        corpus._word_ids = self._word_ids
+        return corpus
+
+    def to_set_list(self):
+        """
+        :return: the collection as list of sets of words, i.e. in the shape of sets_universe
+        """
+        return [self.decode(self.set_ids(i).tolist()) for i in range(len(self))]
+
+
+def save_corpus(corpus, directory, meta=None):
+    """
+    Write a corpus as binary cache into a directory:
+        offsets.npy, elements.npy   the CSR arrays
+        vocabulary.txt              one word per line, in ID order
+        meta.json                   written last; a cache without it is incomplete
+    :param corpus: the Corpus
+    :param directory: target directory; created if needed
+    :param meta: optional dict (JSON-serializable) stored next to the arrays, e.g. the cache key
+    """
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    np.save(os.path.join(directory, "offsets.npy"), np.asarray(corpus.offsets, dtype=np.int64))
+    np.save(os.path.join(directory, "elements.npy"), np.asarray(corpus.elements, dtype=np.int32))
+    with open(os.path.join(directory, "vocabulary.txt"), "w", encoding="utf-8") as f:
+        for word in corpus.vocabulary:
+            f.write(word + "\n")
+
+    meta = dict(meta or {})
+    meta["format_version"] = CORPUS_FORMAT_VERSION
+    meta["sets"] = len(corpus)
+    meta["words"] = corpus.universe_size
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def load_corpus(directory, mmap=True):
+    """
+    Load a corpus written by save_corpus().
+    :param directory: cache directory
+    :param mmap: if set true, the arrays are memory mapped (read-only) instead of read into memory
+    :return: the Corpus and its meta dict, or (None, None) if there is no complete cache of this format version
+    """
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None, None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != CORPUS_FORMAT_VERSION:
+        return None, None
+
+    mmap_mode = 'r' if mmap else None
+    offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode=mmap_mode)
+    elements = np.load(os.path.join(directory, "elements.npy"), mmap_mode=mmap_mode)
+    with open(os.path.join(directory, "vocabulary.txt"), encoding="utf-8") as f:
+        vocabulary = f.read().split("\n")[:-1]
+
+    return Corpus(vocabulary, offsets, elements), meta
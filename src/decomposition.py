@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+
+from src.corpus import Corpus
+from src.disk_friendly_greedy import disk_friendly_greedy
+from src.greedy import greedy_by_balas, greedy_by_balas_with_coverage_matrix
+from src.preprocesses import build_inverted_index, map_solution_to_original
+from src.simulated_annealing import simulated_annealing
+
+# The read-only collection of a worker process, see init_worker()
+shared_sets = None
+shared_elements = None
+
+
+class UnionFind(object):
+    """
+    Disjoint-set forest over the items 0..amount_items-1 with union by size and path halving;
+    find() and union() take nearly constant time.
+    """
+
+    def __init__(self, amount_items):
+        self.parent = list(range(amount_items))
+        self.size = [1] * amount_items
+
+    def find(self, item):
+        """
+        :return: the representative of the component of item
+        """
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, item_a, item_b):
+        """
+        Merge the components of two items.
+        """
+        root_a = self.find(item_a)
+        root_b = self.find(item_b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+def find_components(set_collection, inverted_index=None):
+    """
+    Find the connected components of the incidence graph of sets and elements: two sets are in the same
+    component if they share an element, directly or via other sets. All sets containing an element are
+    united along its entry of the inverted index. Components can be covered independently of each other.
+    :param set_collection: collection of sets (list of sets or Corpus)
+    :param inverted_index: inverted index of set_collection, see build_inverted_index(); built if not given
+    :return: list of components, each a list of set indices (ascending); largest component first.
+             Empty sets belong to no component.
+    """
+    print("Finding connected components of the sets...")
+    if inverted_index is None:
+        inverted_index = build_inverted_index(set_collection)
+
+    union_find = UnionFind(len(set_collection))
+    for occurrences in inverted_index.values():
+        first_set = occurrences[0]
+        for set_i in occurrences[1:]:
+            union_find.union(first_set, set_i)
+
+    components = dict()
+    for set_i in range(len(set_collection)):
+        if len(set_collection[set_i]) > 0:
+            components.setdefault(union_find.find(set_i), list()).append(set_i)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def solve_with_disk_friendly_greedy(sets, elements, share, p=2, **options):
+    """
+    Component solver running disk_friendly_greedy() with the given p.
+    :param share: share of the component in the instance; not used
+    """
+    return disk_friendly_greedy(sets, p, **options)
+
+
+def solve_with_greedy_by_balas(sets, elements, share, **options):
+    """
+    Component solver running greedy_by_balas().
+    :param share: share of the component in the instance; not used
+    """
+    return greedy_by_balas(sets, elements, **options)
+
+
+def solve_with_simulated_annealing(sets, elements, share, running_time=60, **options):
+    """
+    Component solver running simulated_annealing() on a greedy start solution of the component.
+    Components covered by a single set already are not annealed.
+    :param share: share of the component in the instance; the component gets this share of running_time
+    :param running_time: running time of the whole instance in seconds
+    """
+    solution, amount_elements_covered_dict = greedy_by_balas_with_coverage_matrix(sets, elements)
+    if len(solution) <= 1:
+        return solution
+    best_solution, _ = simulated_annealing(sets, solution, amount_elements_covered_dict, running_time * share, **options)
+    return best_solution
+
+
+# Component solvers by name; each is called as solver(sets, elements, share, **solver_options)
+COMPONENT_SOLVERS = {
+    "disk_friendly_greedy": solve_with_disk_friendly_greedy,
+    "greedy_by_balas": solve_with_greedy_by_balas,
+    "simulated_annealing": solve_with_simulated_annealing
+}
+
+
+def solve_by_components(sets, elements=None, solver="disk_friendly_greedy", solver_options=None, processes=None, min_parallel_size=10000, print_logs=False):
+    """
+    Split a set cover instance into its connected components (see find_components()), solve each component on
+    its own and merge the solutions. Components consisting of one set are solved right away; the set is taken
+    only if it contains an element to cover. Components whose sets have at least min_parallel_size elements in
+    total are solved in a process pool, the smaller ones inline.
+
+    Example:
+
+    solve_by_components(sets_universe, wds_universe, solver="simulated_annealing",
+                        solver_options={"running_time": 600, "neighbourhood_scale": 0.1})
+
+    :param sets: collection of sets (list of sets or Corpus); only read
+    :param elements: elements that need to be covered (word IDs for a Corpus); all elements of the sets if None
+    :param solver: name of a solver in COMPONENT_SOLVERS or a module-level function with the same signature
+    :param solver_options: dict of keyword arguments for the solver, e.g. p or running_time
+    :param processes: number of worker processes; the number of CPUs if None. No pool is used if 1.
+    :param min_parallel_size: minimum sum of set sizes of a component to be solved in the process pool
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: solution set containing a sub-collection of indices of sets
+    """
+
+    print("+-------------------------+")
+    print("| Component Decomposition |")
+    print("+-------------------------+\n")
+
+    """
+    Initialization
+    """
+    if not callable(solver):
+        solver = COMPONENT_SOLVERS[solver]
+    solver_options = dict(solver_options or {})
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    components = find_components(sets)
+    component_sizes = [sum(len(sets[set_i]) for set_i in component) for component in components]
+    total_size = sum(component_sizes) or 1
+
+    if print_logs:
+        print("Components: ", len(components), " largest: ", len(components[0]) if components else 0, " sets")
+
+    """
+    Solving the components
+    """
+    solution_indices = set()
+    parallel_tasks = list()
+    for component, size in zip(components, component_sizes):
+        if len(component) == 1:
+            if elements is None or not elements.isdisjoint(sets[component[0]]):
+                solution_indices.add(component[0])
+        elif size >= min_parallel_size and processes > 1:
+            parallel_tasks.append((solver, component, size / total_size, solver_options))
+        else:
+            solution_indices |= solve_component(solver, sets, elements, component, size / total_size, solver_options)
+
+    if parallel_tasks:
+        with multiprocessing.Pool(min(processes, len(parallel_tasks)), initializer=init_worker, initargs=(sets, elements)) as pool:
+            for component_solution in pool.imap_unordered(solve_shared_component, parallel_tasks):
+                solution_indices |= component_solution
+
+    if print_logs:
+        print("Components solved in the process pool: ", len(parallel_tasks))
+        print("Amount of indices in solution: ", len(solution_indices))
+
+    return solution_indices
+
+
+def init_worker(sets, elements):
+    """
+    Initializer of the worker processes; keeps the read-only collection for all components solved by this worker.
+    """
+    global shared_sets, shared_elements
+    shared_sets = sets
+    shared_elements = elements
+
+
+def solve_shared_component(task):
+    """
+    Solve one component of the collection shared with this worker, see solve_component().
+    :param task: (solver, set indices of the component, share of the component, solver options)
+    :return: solution of the component as set of indices of the whole collection
+    """
+    solver, component, share, solver_options = task
+    return solve_component(solver, shared_sets, shared_elements, component, share, solver_options)
+
+
+def solve_component(solver, sets, elements, component, share, solver_options):
+    """
+    Solve one component of a collection. Its sets are restricted to the elements that need to be covered first.
+    :param solver: component solver, see COMPONENT_SOLVERS
+    :param sets: the whole collection of sets (list of sets or Corpus)
+    :param elements: elements that need to be covered; all elements of the sets if None
+    :param component: set indices of the component
+    :param share: share of the component in the instance
+    :param solver_options: dict of keyword arguments for the solver
+    :return: solution of the component as set of indices of the whole collection
+    """
+    if isinstance(sets, Corpus):
+        component_sets = sets.select(component)
+    else:
+        component_sets = [sets[set_i] for set_i in component]
+
+    component_elements = set()
+    for component_set in component_sets:
+        component_elements.update(component_set)
+    if elements is not None and not component_elements <= elements:
+        # The sets are restricted to the elements to cover, so no solver spends sets on the others
+        component_elements &= elements
+        if isinstance(component_sets, Corpus):
+            component_sets = component_sets.restrict(component_elements)
+        else:
+            component_sets = [component_set & component_elements for component_set in component_sets]
+    # Nothing to cover in this component
+    if not component_elements:
+        return set()
+
+    component_solution = solver(component_sets, component_elements, share, **solver_options)
+    return map_solution_to_original(component_solution, component)
@@ -1,14 +1,23 @@
 import math
-from copy import deepcopy
+import os
+import shutil
+import struct
+import tempfile
+from array import array
 from math import log
 
+import numpy as np
+
+from src.bitsets import bitset_elements, popcount, to_bitsets, union_bitset
+from src.corpus import Corpus
+from src.postprocesses import remove_redundant_sets
 from src.preprocesses import *
-from text_coverage_data import sets_universe
+from text_coverage_data import load_dataset
 
 from collections import *
 
 
-def disk_friendly_greedy(sets, p, max_subcol_size=3000, print_logs=False):
+def disk_friendly_greedy(sets, p, max_subcol_size=None, use_bitsets=False, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
     """
     An special implementation of the greedy algorithm to cover large data sets. It is based on building
     sub-collections by the size of the sets given which might be faster for modern data sizes.
@@ -17,9 +26,18 @@ def disk_friendly_greedy(sets, p, max_subcol_size=3000, print_logs=False):
         Cormode, G., Karloff, H., & Wirth, A. (n.d.). Set Cover Algorithms For Very Large Datasets.
         http://dimacs.rutgers.edu/~graham/pubs/papers/ckw.pdf
 
-    :param sets: / set_collection: collection of len_set_collection subsets / and a copy of it; = sets_universe (1)
+    :param sets: / set_collection: collection of len_set_collection subsets; = sets_universe or its Corpus (1);
+                                   only read
     :param p: parameter > 1; rules the sizes of the created sub-collections. approximation and running time factor (2)
-    :param max_subcol_size: maximum size of a sub-collection
+    :param max_subcol_size: optional maximum size of a sub-collection, see build_subcollections()
+    :param use_bitsets: if set true, the sets and the covered elements are packed into bitsets (see to_bitsets()),
+                        so Si \ C is one word-level Si & ~C. Falls back to sets if the bitsets would not fit
+                        into memory.
+    :param target_coverage: fraction of the elements that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
 
     :param print_logs: prints outputs and parameters of used functions.
     :return: solution list containing a sub-collection of indices of set_collection
@@ -27,23 +45,24 @@ def disk_friendly_greedy(sets, p, max_subcol_size=3000, print_logs=False):
 
     # List of important variables, constants and lists:
     #
-    # set_collection    (1)     <class 'list'> containing 'set's
+    # set_collection    (1)     <class 'list'> containing 'set's; sets may also be given as Corpus
     # p                 (2)     float
 
     # solution_indices  (3)     <class 'set'>
     # covered_elements  (4)     <class 'set'>
     #
-    # inverted_index    (5)     defaultdict(<class 'list'>) Example: {'F': [1, 2], 'G': [1, 2, 3, 4], 'H': [4, 5], 'I': [6, 9]}
+    # amount_elements   (5)     int; number of distinct elements in the sets, i.e. the coverable elements
     # set_lengths       (6)     <class 'list'>  containing same indices i as in (2)
-    # subcollections    (7)     <class 'list'>  containing set's Example: [{8, 9, 7}, {2, 3, 4, 5, 6}, {0, 1}]
+    # subcollections    (7)     <class 'defaultdict'> of lists keyed by k Example: {3: [8, 9, 7], 2: [2, 3, 4, 5, 6], 1: [0, 1]}
     #
     # k and K           (8a,8b) int's
+    # residual_sets     (9)     <class 'dict'>  Si \ C of the sets moved to a lower subcollection
 
     print("+----------------------+")
     print("| Disk-Friendly Greedy |")
     print("+----------------------+\n")
 
-    set_collection = deepcopy(sets) # (1)
+    set_collection = sets   # (1)
     print("Selected p-Value: ", p)  # (2)
     print("Number of sets for covering: ", str(len(set_collection)), "\n")
 
@@ -64,9 +83,23 @@ def disk_friendly_greedy(sets, p, max_subcol_size=3000, print_logs=False):
 
 
 
-    # Create an inverted index (5) from our set_collection
-    # and save it as defaultdict(<class 'list'>, ...)
-    inverted_index = build_inverted_index(set_collection, print_output=print_logs)  # (5)
+    # With bitsets, the residual sets Si \ C are kept as bitsets (in place of (9)) and C as bitset
+    bitsets = to_bitsets(set_collection) if use_bitsets else None
+    if use_bitsets and bitsets is None:
+        print("Universe too large for bitsets; using sets.")
+    covered_bitset = 0
+
+    # Partial cover: the loop ends as soon as target_elements of the coverable elements (5) are covered
+    # or max_sets sets are selected
+    if bitsets is not None:
+        amount_elements = popcount(union_bitset(bitsets))  # (5)
+    else:
+        amount_elements = count_coverable_elements(set_collection)  # (5)
+    target_elements = compute_coverage_target(amount_elements, target_coverage)
+    amount_covered = 0
+
+    def limit_reached():
+        return amount_covered >= target_elements or (max_sets is not None and len(solution_indices) >= max_sets)
 
 
     # Compute lengths for each set and save it in list. We then get a list of lengths of sets (6)
@@ -82,89 +115,74 @@ def disk_friendly_greedy(sets, p, max_subcol_size=3000, print_logs=False):
     # Sk := set_length[i];
     # K (8b) may be the greatest k with non-empty Sk.
     # This approach is the main contribution of Cormode et al.
-    subcollections = build_subcollections(p, set_collection,  set_lengths, max_subcol_size=max_subcol_size, print_params=print_logs, print_output=print_logs) # (7)
-    k_values = subcollections.keys()    # (8)
-    k = max(k_values)                   # = (8b)
+    subcollections = build_subcollections(p, set_collection,  set_lengths, max_subcol_size=max_subcol_size, print_params=print_logs, print_output=print_logs)
+    # As lists, so sets moved to a lower subcollection can be appended
+    subcollections = defaultdict(list, {k: bucket.tolist() for k, bucket in subcollections.items()}) # (7)
+    k_values = subcollections.keys()            # (8)
+    k = max(k_values) if k_values else 0        # = (8b)
 
 
     """
     Main Algorithm
     """
 
-    # 1. Loop in the algorithm.
-    # Iterating from subcollection with the longest sets down
-    # to the subcollection with set_lengths higher than 1.
-    print("\nFirst loop.")
-    while k > 1:
+    # Loop in the algorithm.
+    # Iterating from subcollection with the longest sets down to the subcollection with set_lengths of 1.
+    # Si \ C is computed by checking the few elements of Si against the covered elements (O(|Si|)),
+    # the covered elements are never iterated. The residual sets are saved in residual_sets (9)
+    # instead of changing the sets of set_collection.
+    print("\nLoop.")
+    residual_sets = dict()  # (9)
+    while k >= 1 and not limit_reached():
         pk_lower = pow(p, k-1)
-        try:
-            for set_i in subcollections.get(k):
+        for set_i in subcollections.get(k, []):
+            if limit_reached():
+                break
 
-                # | Si \ C | >= p^(k-1) ;
+            if bitsets is not None:
+                # { Si \ C } and | Si \ C | word by word
+                bitsets[set_i] &= ~covered_bitset
+                set_lengths[set_i] = popcount(bitsets[set_i])
                 if set_lengths[set_i] >= pk_lower:
-                        # if there are already elements covered which are in set_collection[set_i]:
-                        # - update the inverted index by removing the index, (a)
-                        # - remove them from the set, (b)
-                        # - add it to the subcollection Sk' where p^k-1 <= set_length[set_i] < p^k, (c)
-                        if len(covered_elements) > 0:
-                            for element in covered_elements:
-                                # { Si(element) € C }:
-                                if element not in set_collection[set_i]:
-                                    continue
-                                # { Si(element) \ C }:
-                                else:
-                                    elements_occurrences = inverted_index.get(element)
-                                    if set_i in elements_occurrences:
-                                        elements_occurrences.remove(set_i)              # (a)
-                                        inverted_index[element] = elements_occurrences  # (a)
-
-                                        set_collection[set_i].remove(element)           # (b)
-                                        set_lengths[set_i] -= 1
-
-                            if set_lengths[set_i] >= pk_lower:
-                                current_col = subcollections.get(k)
-                                current_col.remove(set_i)
-                                if set_lengths[set_i] != 0:
-                                    new_k = int(math.ceil(log(set_lengths[set_i], p)))+1
-                                    # b = pow(p, new_k - 1) <= set_lengths[set_i] & set_lengths[set_i] < pow(p, new_k)
-                                    try:
-                                        next_col = subcollections.get(new_k)
-                                        next_col.append(set_i)
-                                        subcollections[k-1] = next_col  # (c)
-                                    except AttributeError:
-                                        pass
-                                continue
-
-                        solution_indices.add(set_i)
-                        for element in set_collection[set_i]:
-                            if element not in covered_elements:
-                                covered_elements.add(element)
-                            elements_occurrences = inverted_index.get(element)
-                            if set_i in elements_occurrences:
-                                elements_occurrences.remove(set_i)
-                                inverted_index[element] = elements_occurrences
-        except TypeError:
-            pass
+                    solution_indices.add(set_i)
+                    covered_bitset |= bitsets[set_i]
+                    amount_covered += set_lengths[set_i]
+                elif set_lengths[set_i] > 0:
+                    subcollections[subcollection_level(set_lengths[set_i], p)].append(set_i)    # (c)
+                continue
+
+            current_set = residual_sets.get(set_i, set_collection[set_i])
+
+            # { Si \ C }; the elements in C are removed from the set
+            residual = [element for element in current_set if element not in covered_elements]
+            set_lengths[set_i] = len(residual)
+
+            # | Si \ C | >= p^(k-1) ;
+            if set_lengths[set_i] >= pk_lower:
+                solution_indices.add(set_i)
+                covered_elements.update(residual)
+                residual_sets.pop(set_i, None)
+                amount_covered += set_lengths[set_i]
+
+            # otherwise add it to the subcollection Sk' where p^k'-1 <= set_length[set_i] < p^k' ; k' < k (c)
+            elif set_lengths[set_i] > 0:
+                residual_sets[set_i] = residual
+                subcollections[subcollection_level(set_lengths[set_i], p)].append(set_i)    # (c)
+            else:
+                residual_sets.pop(set_i, None)
         k -= 1
 
+    if bitsets is not None:
+        # Element IDs of the interned universe
+        covered_elements = set(bitset_elements(covered_bitset).tolist())
 
     if print_logs:
-        print("Already covered after 1. loop: ", covered_elements)
-        print("# Already covered after 1. loop: ", len(covered_elements))
+        print("Already covered after loop: ", covered_elements)
+        print("# Already covered after loop: ", len(covered_elements))
+
+    if remove_redundant is not None:
+        solution_indices, _ = remove_redundant_sets(set_collection, solution_indices, remove_redundant, print_logs=print_logs)
 
-    # 2. Loop in the algorithm.
-    # The last remaining subcollection is that one that only contains sets with set_length = 1.
-    print("\nSecond loop.")
-    try:
-        for set_i in subcollections.get(1):
-            for element in covered_elements:
-                if set_lengths[set_i] == 1:
-                    if set_collection[set_i].pop() not in covered_elements:
-                        solution_indices.add(set_i)
-                        covered_elements.add(element)
-                    set_lengths[set_i] -= 1
-    except TypeError:
-        pass
     return solution_indices
 
 
@@ -173,59 +191,259 @@ def is_set_length_higher_or_equal_pk_lower(pk_lower, set_i, set_lengths):
     return set_length_bigger_pk_lower
 
 
-def build_subcollections(p, set_collection, set_lengths, max_subcol_size=3000, print_params=False, print_output=False):
+def build_subcollections(p, set_collection, set_lengths, max_subcol_size=None, print_params=False, print_output=False):
     """
-    Seperate sets in Sk subcollections; k is lowest exponent on p, K is the highest
-    :param max_subcol_size: maximum size of a sub-collection
+    Seperate sets in Sk subcollections; k is lowest exponent on p, K is the highest.
+    Every set is assigned to its level  k = floor(log_p(set_length)) + 1 , i.e.  p^(k-1) <= set_length < p^k ,
+    in one vectorized pass, so the cost does not depend on p. Empty sets are left out.
+    :param max_subcol_size: optional maximum size of a sub-collection; larger sub-collections are cut to their
+                            first max_subcol_size sets and every cut is reported
     :param p: rules the sizes of the created sub-collections. see also documentation in disk_friendly_greedy()
     :param set_collection: collection of sets
     :param set_lengths: list containing the lengths of the set in the whole set_collection; indices are the same
     :param print_params: if set true, parameters p, k, K and p^K are printed out
     :param print_output: if set true, the subcollections are printed out
-    :return subcollections: the subcollections as defaultdict of lists
+    :return subcollections: the subcollections as dict of int64 arrays of set indices, keyed by k
     """
     if print_params or print_output:
         print("---------------------------------\n")
 
     print("Building subcollections of given sets and index them in a dict...")
 
-    subcollections = defaultdict(list)
+    lengths = np.asarray(set_lengths, dtype=np.int64)
+    set_indices = np.flatnonzero(lengths > 0)
+    lengths = lengths[set_indices]
+
+    levels = np.floor(np.log(lengths) / log(p)).astype(np.int64) + 1
+    # Correct rounding errors of the logarithm at the borders
+    levels[np.power(float(p), levels - 1) > lengths] -= 1
+    levels[np.power(float(p), levels) <= lengths] += 1
+
+    order = np.argsort(levels, kind='stable')
+    k_values, starts = np.unique(levels[order], return_index=True)
+    subcollections = dict(zip(k_values.tolist(), np.split(set_indices[order], starts[1:])))
 
-    K = log(max(set_lengths), p)
-    for k in range(1, math.ceil(K)+1):
-        for i in range(len(set_lengths)):
-            if round(pow(p, k - 1)) <= set_lengths[i] & set_lengths[i] < round(pow(p, k)):
-                subcollections[k].append(i)
+    if max_subcol_size is not None:
+        for k in subcollections:
             if len(subcollections[k]) > max_subcol_size:
-                break
+                print("Subcollection", k, "capped: keeping", max_subcol_size, "of", len(subcollections[k]), "sets,",
+                      len(subcollections[k]) - max_subcol_size, "sets are not considered.")
+                subcollections[k] = subcollections[k][:max_subcol_size]
 
     if print_params:
+        K = max(subcollections) if subcollections else 0
         print("Parameters:")
         print("max(set_lengths): ", str(max(set_lengths)))
         print("p: ", str(p))
         print("K: ", str(K))
         print("p^K: ", str(pow(p, K)))
-        print("")
-        print("K+1: ", str(K + 1))
-        print("k: ", str(k), "  # After subcollectioning - also is the 'new' K")
-        print("p^K: ", str(pow(p, K)), "  # After subcollectioning")
-        print("p^K+1: ", str(pow(p, K+1)), "  # After subcollectioning")
+        print("Amount of non-empty subcollections: ", str(len(subcollections)))
     if print_output:
         print("\n---   ---   ---   ---   ---   ---")
         print("Subcollections:")
         print(subcollections)
-        for i in range(len(subcollections)):
-            print("Subcollection #", str(i), ":")
-            for j in range(len(subcollections[i])):
-                set_num = subcollections[i][j]
+        for k in sorted(subcollections):
+            print("Subcollection #", str(k), ":")
+            for set_num in subcollections[k]:
                 print(set_collection[set_num])
         print("---------------------------------\n")
 
     return subcollections
 
 
+def subcollection_level(set_length, p):
+    """
+    Level k of the sub-collection a set belongs to:  p^(k-1) <= set_length < p^k
+    :param set_length: length of the set (> 0)
+    :param p: parameter > 1, see disk_friendly_greedy()
+    :return: k as int >= 1
+    """
+    k = int(log(set_length, p)) + 1
+    # Correct rounding errors of log() at the borders
+    while k > 1 and pow(p, k - 1) > set_length:
+        k -= 1
+    while pow(p, k) <= set_length:
+        k += 1
+    return k
+
+
+# Record layout of a collection file: int32 set index, int32 length, length * int32 element IDs
+RECORD_HEADER = struct.Struct("<ii")
+
+
+def write_collection_file(sets, path):
+    """
+    Write a collection of sets of element IDs to a binary collection file, which can be streamed by
+    disk_friendly_greedy_out_of_core().
+    :param sets: Corpus or collection of sets of int element IDs
+    :param path: file to write
+    """
+    print("Writing collection file", path, "...")
+    with open(path, "wb") as f:
+        for set_i in range(len(sets)):
+            if isinstance(sets, Corpus):
+                element_ids = sets.set_ids(set_i).astype("<i4", copy=False)
+            else:
+                element_ids = array('i', sorted(sets[set_i]))
+            f.write(RECORD_HEADER.pack(set_i, len(element_ids)))
+            f.write(element_ids.tobytes())
+
+
+def read_collection_file(path):
+    """
+    Stream the sets of a collection file, see write_collection_file().
+    :param path: file to read
+    :return: generator of (set index, <class 'array'> of element IDs)
+    """
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            set_i, length = RECORD_HEADER.unpack(header)
+            element_ids = array('i')
+            element_ids.frombytes(f.read(4 * length))
+            yield set_i, element_ids
+
+
+def disk_friendly_greedy_out_of_core(collection_path, p, universe_size, spill_dir=None, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
+    """
+    Out-of-core variant of disk_friendly_greedy() as described by Cormode et al.:
+    the sets are streamed from a collection file and never held in memory together.
+
+    1. One pass over the collection file writes every set to the spill file of its sub-collection level k
+       ( p^(k-1) <= |Si| < p^k ).
+    2. The levels are processed from the highest k down to 1, each in one pass over its spill file.
+       A set whose residual |Si \ C| is still >= p^(k-1) is added to the solution and its elements get covered.
+       Otherwise its (non-empty) residual is appended to the spill file of the lower level it now belongs to.
+
+    Only the covered elements are kept in memory, as a bytearray indexed by element ID, so the peak memory
+    is bounded by the size of the universe and not by the size of the collection (apart from the solution).
+
+    :param collection_path: collection file, see write_collection_file()
+    :param p: parameter > 1; rules the sizes of the created sub-collections
+    :param universe_size: number of elements; all element IDs have to be lower
+    :param spill_dir: directory for the per-level spill files; a temporary directory if None.
+                      The spill files are deleted after being processed.
+    :param target_coverage: fraction of the elements (occurring in a set) that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end (one more pass over
+                             the collection file reads the sets of the solution), in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: solution set containing a sub-collection of indices of the collection
+    """
+
+    print("+------------------------------------+")
+    print("| Disk-Friendly Greedy (out of core) |")
+    print("+------------------------------------+\n")
+    print("Selected p-Value: ", p)
+
+    """
+    Initialization & Pre-processes
+    """
+    print("Initialization.")
+
+    solution_indices = set()
+    covered_elements = bytearray(universe_size)
+    # Elements occurring in a set; only needed for a partial cover
+    partial_cover = target_coverage < 1 or max_sets is not None
+    occurring_elements = bytearray(universe_size) if partial_cover else None
+    amount_covered = 0
+
+    temporary_dir = None
+    if spill_dir is None:
+        spill_dir = temporary_dir = tempfile.mkdtemp(prefix="dfg_spill_")
+    else:
+        os.makedirs(spill_dir, exist_ok=True)
+
+    spill_paths = dict()
+    spill_files = dict()
+
+    def spill(k, set_i, element_ids):
+        if k not in spill_files:
+            spill_paths[k] = os.path.join(spill_dir, "level_" + str(k) + ".bin")
+            spill_files[k] = open(spill_paths[k], "wb")
+        spill_files[k].write(RECORD_HEADER.pack(set_i, len(element_ids)))
+        spill_files[k].write(element_ids.tobytes())
+
+    try:
+        # Partitioning the collection into the per-level spill files in one pass
+        print("Partitioning the collection into sub-collection files...")
+        for set_i, element_ids in read_collection_file(collection_path):
+            if len(element_ids) > 0:
+                spill(subcollection_level(len(element_ids), p), set_i, element_ids)
+                if partial_cover:
+                    for element in element_ids:
+                        occurring_elements[element] = 1
+        target_elements = compute_coverage_target(sum(occurring_elements) if partial_cover else 0, target_coverage)
+
+        """
+        Main Algorithm
+        """
+        print("\nLoop.")
+        k = max(spill_files) if spill_files else 0
+        while k >= 1:
+            if partial_cover and (amount_covered >= target_elements or
+                                  (max_sets is not None and len(solution_indices) >= max_sets)):
+                break
+            if k not in spill_files:
+                k -= 1
+                continue
+
+            spill_files.pop(k).close()
+            pk_lower = pow(p, k - 1)
+            selected = 0
+            moved = 0
+            for set_i, element_ids in read_collection_file(spill_paths[k]):
+                if partial_cover and (amount_covered >= target_elements or
+                                      (max_sets is not None and len(solution_indices) >= max_sets)):
+                    break
+
+                # Si \ C
+                residual = array('i', [element for element in element_ids if not covered_elements[element]])
+
+                # | Si \ C | >= p^(k-1) ;
+                if len(residual) >= pk_lower:
+                    solution_indices.add(set_i)
+                    for element in residual:
+                        covered_elements[element] = 1
+                    amount_covered += len(residual)
+                    selected += 1
+                elif len(residual) > 0:
+                    spill(subcollection_level(len(residual), p), set_i, residual)
+                    moved += 1
+
+            os.remove(spill_paths.pop(k))
+            if print_logs:
+                print("k =", k, " selected sets:", selected, " moved to lower levels:", moved)
+            k -= 1
+    finally:
+        for f in spill_files.values():
+            f.close()
+        # Levels left over by a partial cover or an error
+        for path in spill_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        if temporary_dir is not None:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+    if print_logs:
+        print("Amount of indices in solution: ", len(solution_indices))
+        print("Covered elements: ", sum(covered_elements))
+
+    if remove_redundant is not None:
+        solution_sets = {set_i: element_ids for set_i, element_ids in read_collection_file(collection_path)
+                         if set_i in solution_indices}
+        solution_indices, _ = remove_redundant_sets(solution_sets, solution_indices, remove_redundant, print_logs=print_logs)
+
+    return solution_indices
+
+
 
 if __name__ == "__main__":
+    wds_universe, sets_universe = load_dataset("reuters")
     print("")
 
     """
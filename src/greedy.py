@@ -1,11 +1,12 @@
 import random
-from collections import defaultdict
 from copy import deepcopy
 
-from src.preprocesses import sort_collection_by_set_sizes_with_comparison_list
+from src.preprocesses import build_first_covering_set_index, build_inverted_index, compute_coverage_target, \
+    count_element_coverage, sort_set_indices_by_set_sizes
+from src.postprocesses import remove_redundant_sets
 
 
-def greedy_by_balas(sets, elements, print_logs=False):
+def greedy_by_balas(sets, elements, skip_covered=False, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
     """
     Find a feasible solution for the set cover problem with greedy heuristic.
 
@@ -15,8 +16,17 @@ def greedy_by_balas(sets, elements, print_logs=False):
     They based this algorithm on an approach by:
         Balas, E., & Ho, A. (1980). Set covering algorithms using cutting planes, heuristics, and subgradient
         optimization: a computational study. In Combinatorial optimization (pp. 37-60). Springer, Berlin, Heidelberg.
-    :param sets: collection of sets; with set_collection as a copy of it
+    :param sets: collection of sets (list of sets or Corpus); only read
     :param elements: set of words/elements to be covered; with words_to_cover as a copy of it
+                     (for a Corpus the word IDs, e.g. corpus.universe())
+    :param skip_covered: if set true, only words which are not yet covered by a selected set are picked;
+                         all words of a selected set are dropped at once. Takes about as many iterations as
+                         the solution has sets instead of one per word, but draws different random words.
+    :param target_coverage: fraction of the elements that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
     :param print_logs: prints outputs and parameters of used functions.
     :return: solution set containing a sub-collection of indices of set_collection; <class 'set'>
 
@@ -32,14 +42,27 @@ def greedy_by_balas(sets, elements, print_logs=False):
 
     print("\nInitialization.")
 
-    set_collection = deepcopy(sets)
-    sorted_collection, comparison_list = sort_collection_by_set_sizes_with_comparison_list(set_collection)
+    set_collection = sets
+    comparison_list = sort_set_indices_by_set_sizes(set_collection)
+
+    # Position of the first set in size order containing an element, for each element
+    first_covering_set_index = build_first_covering_set_index(build_inverted_index(set_collection), comparison_list)
 
     words_to_cover = list(deepcopy(elements))
     amount_uncovered_words = len(words_to_cover)
 
     solution_indices = list()
 
+    # Partial cover: the covered words and the selected sets are tracked to stop as soon as a limit is reached
+    partial_cover = target_coverage < 1 or max_sets is not None
+    # Only words contained in a set can be covered; as in the other solvers the target is a fraction of those
+    amount_coverable_words = sum(1 for word in words_to_cover if word in first_covering_set_index)
+    target_words = compute_coverage_target(amount_coverable_words, target_coverage)
+    if partial_cover:
+        elements_to_cover = set(words_to_cover)
+        covered_words = set()
+        selected_sets = set()
+
     """
     Main-Algorithm
     """
@@ -47,30 +70,43 @@ def greedy_by_balas(sets, elements, print_logs=False):
     print("\nLoop.")
     print("Iterating over all words that need to get covered...")
 
+    if skip_covered:
+        solution_indices = select_sets_for_uncovered_words(set_collection, words_to_cover,
+                                                           first_covering_set_index, comparison_list,
+                                                           target_words, max_sets)
+        amount_uncovered_words = 0
+
     # Iterating over all words that need to get covered (= step 3 in paper also)
     while amount_uncovered_words > 0:
+        if partial_cover and (len(covered_words) >= target_words or
+                              (max_sets is not None and len(selected_sets) >= max_sets)):
+            break
+
         # 1. Select randomly one of the words
         random_index = random.randint(0, amount_uncovered_words-1)
         random_word = words_to_cover[random_index]
 
         # 2. Select first set in natural order
-        for set_i in sorted_collection:
-            # If the random word is part of the current chosen set,
-            # then add the index of the set to solution_indices
-            if random_word in set_i:
-
-                sorted_set_index = sorted_collection.index(set_i)
-                original_set_index = comparison_list[sorted_set_index]
-
-                solution_indices.append(original_set_index)
-                break
-
-        words_to_cover.remove(random_word)
+        # and add its index to solution_indices (words contained in no set are skipped)
+        sorted_set_index = first_covering_set_index.get(random_word)
+        if sorted_set_index is not None:
+            original_set_index = comparison_list[sorted_set_index]
+            solution_indices.append(original_set_index)
+            if partial_cover and original_set_index not in selected_sets:
+                selected_sets.add(original_set_index)
+                covered_words.update(word for word in set_collection[original_set_index] if word in elements_to_cover)
+
+        # Remove the word in O(1) by moving the last word to its position
+        words_to_cover[random_index] = words_to_cover[-1]
+        words_to_cover.pop()
         amount_uncovered_words -= 1
 
     # 4. Remove redundant entries in list by saving it as a set
     solution_indices = set(solution_indices)
 
+    if remove_redundant is not None:
+        solution_indices, _ = remove_redundant_sets(set_collection, solution_indices, remove_redundant, print_logs=print_logs)
+
 
 
     if print_logs:
@@ -80,7 +116,7 @@ def greedy_by_balas(sets, elements, print_logs=False):
     return solution_indices
 
 
-def greedy_by_balas_with_coverage_matrix(sets, elements, print_logs=False):
+def greedy_by_balas_with_coverage_matrix(sets, elements, skip_covered=False, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
     """
     Find a feasible solution for the set cover problem with greedy heuristic.
 
@@ -90,10 +126,20 @@ def greedy_by_balas_with_coverage_matrix(sets, elements, print_logs=False):
     They based this algorithm on an approach by:
         Balas, E., & Ho, A. (1980). Set covering algorithms using cutting planes, heuristics, and subgradient
         optimization: a computational study. In Combinatorial optimization (pp. 37-60). Springer, Berlin, Heidelberg.
-    :param sets: collection of sets; with set_collection as a copy of it
+    :param sets: collection of sets (list of sets or Corpus); only read
     :param elements: set of words/elements to be covered; with words_to_cover as a copy of it
+                     (for a Corpus the word IDs, e.g. corpus.universe())
+    :param skip_covered: if set true, only words which are not yet covered by a selected set are picked;
+                         all words of a selected set are dropped at once. Takes about as many iterations as
+                         the solution has sets instead of one per word, but draws different random words.
+    :param target_coverage: fraction of the elements that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
     :param print_logs: prints outputs and parameters of used functions.
     :return: solution set containing a sub-collection of indices of set_collection; <class 'set'> and a dict which saves the numbers, how often each element is covered
+             by the sets of the solution
 
     """
     print("\n\n____________________\n")
@@ -107,17 +153,27 @@ def greedy_by_balas_with_coverage_matrix(sets, elements, print_logs=False):
 
     print("\nInitialization.")
 
-    set_collection = deepcopy(sets)
-    sorted_collection, comparison_list = sort_collection_by_set_sizes_with_comparison_list(set_collection)
+    set_collection = sets
+    comparison_list = sort_set_indices_by_set_sizes(set_collection)
+
+    # Position of the first set in size order containing an element, for each element
+    first_covering_set_index = build_first_covering_set_index(build_inverted_index(set_collection), comparison_list)
 
     words_to_cover = list(deepcopy(elements))
-    words_to_cover_dict = defaultdict()
-    for word in words_to_cover:
-        words_to_cover_dict[word] = 0
     amount_uncovered_words = len(words_to_cover)
 
     solution_indices = list()
 
+    # Partial cover: the covered words and the selected sets are tracked to stop as soon as a limit is reached
+    partial_cover = target_coverage < 1 or max_sets is not None
+    # Only words contained in a set can be covered; as in the other solvers the target is a fraction of those
+    amount_coverable_words = sum(1 for word in words_to_cover if word in first_covering_set_index)
+    target_words = compute_coverage_target(amount_coverable_words, target_coverage)
+    if partial_cover:
+        elements_to_cover = set(words_to_cover)
+        covered_words = set()
+        selected_sets = set()
+
     """
     Main-Algorithm
     """
@@ -125,31 +181,48 @@ def greedy_by_balas_with_coverage_matrix(sets, elements, print_logs=False):
     print("\nLoop.")
     print("Iterating over all words that need to get covered...")
 
+    if skip_covered:
+        solution_indices = select_sets_for_uncovered_words(set_collection, words_to_cover,
+                                                           first_covering_set_index, comparison_list,
+                                                           target_words, max_sets)
+        amount_uncovered_words = 0
+
     # Iterating over all words that need to get covered (= step 3 in paper also)
     while amount_uncovered_words > 0:
+        if partial_cover and (len(covered_words) >= target_words or
+                              (max_sets is not None and len(selected_sets) >= max_sets)):
+            break
+
         # 1. Select randomly one of the words
         random_index = random.randint(0, amount_uncovered_words-1)
         random_word = words_to_cover[random_index]
 
         # 2. Select first set in natural order
-        for set_i in sorted_collection:
-            # If the random word is part of the current chosen set,
-            # then add the index of the set to solution_indices
-            if random_word in set_i:
-
-                sorted_set_index = sorted_collection.index(set_i)
-                original_set_index = comparison_list[sorted_set_index]
-
-                solution_indices.append(original_set_index)
-                break
-
-        words_to_cover.remove(random_word)
-        words_to_cover_dict[random_word] += 1
+        # and add its index to solution_indices (words contained in no set are skipped)
+        sorted_set_index = first_covering_set_index.get(random_word)
+        if sorted_set_index is not None:
+            original_set_index = comparison_list[sorted_set_index]
+            solution_indices.append(original_set_index)
+            if partial_cover and original_set_index not in selected_sets:
+                selected_sets.add(original_set_index)
+                covered_words.update(word for word in set_collection[original_set_index] if word in elements_to_cover)
+
+        # Remove the word in O(1) by moving the last word to its position
+        words_to_cover[random_index] = words_to_cover[-1]
+        words_to_cover.pop()
         amount_uncovered_words -= 1
 
     # 4. Remove redundant entries in list by saving it as a set
     solution_indices = set(solution_indices)
 
+    # How often each element is covered by the sets of the solution
+    words_to_cover_dict = count_element_coverage(set_collection, solution_indices, elements)
+
+    if remove_redundant is not None:
+        solution_indices, words_to_cover_dict = remove_redundant_sets(set_collection, solution_indices, remove_redundant,
+                                                                      coverage_counts=words_to_cover_dict,
+                                                                      print_logs=print_logs)
+
 
 
     if print_logs:
@@ -157,3 +230,51 @@ def greedy_by_balas_with_coverage_matrix(sets, elements, print_logs=False):
     print("____________________\n\n")
 
     return solution_indices, words_to_cover_dict
+
+
+def select_sets_for_uncovered_words(set_collection, words_to_cover, first_covering_set_index, comparison_list, target_words=None, max_sets=None):
+    """
+    Main loop of the Balas greedy which only picks words that are still uncovered.
+    The uncovered words are kept in a list with a dict of their positions, so a word is removed in O(1)
+    by moving the last word of the list to its position.
+    :param set_collection: collection of sets
+    :param words_to_cover: list of the words to be covered; is emptied
+    :param first_covering_set_index: see build_first_covering_set_index()
+    :param comparison_list: see sort_set_indices_by_set_sizes()
+    :param target_words: optional amount of words to cover; stops as soon as they are covered
+    :param max_sets: optional maximum amount of sets to select
+    :return: list containing the indices of the selected sets of set_collection
+    """
+    positions = {word: i for i, word in enumerate(words_to_cover)}
+
+    def remove_word(word):
+        position = positions.pop(word)
+        last_word = words_to_cover.pop()
+        if position < len(words_to_cover):
+            words_to_cover[position] = last_word
+            positions[last_word] = position
+
+    solution_indices = list()
+    covered_words = 0
+    while len(words_to_cover) > 0:
+        if (target_words is not None and covered_words >= target_words) or \
+                (max_sets is not None and len(solution_indices) >= max_sets):
+            break
+
+        # 1. Select randomly one of the uncovered words
+        random_word = words_to_cover[random.randint(0, len(words_to_cover)-1)]
+
+        # 2. Select first set in natural order and drop all of its words from the uncovered ones
+        sorted_set_index = first_covering_set_index.get(random_word)
+        if sorted_set_index is None:
+            remove_word(random_word)
+            continue
+
+        original_set_index = comparison_list[sorted_set_index]
+        solution_indices.append(original_set_index)
+        for word in set_collection[original_set_index]:
+            if word in positions:
+                remove_word(word)
+                covered_words += 1
+
+    return solution_indices
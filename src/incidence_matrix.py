@@ -0,0 +1,133 @@
+import numpy as np
+from scipy import sparse
+
+from src.corpus import Corpus
+from src.postprocesses import remove_redundant_sets
+from src.preprocesses import compute_coverage_target
+
+
+def build_incidence_matrix(sets, elements=None, format="csr"):
+    """
+    Build the 0/1 incidence matrix A of a set cover instance: A[e, i] = 1 if element e is contained in set i,
+    i.e. the constraint matrix of the covering problem  min sum(x)  s.t.  A x >= 1, x in {0, 1}.
+
+    For a Corpus the matrix is built directly on its CSR arrays (set i is row i of A^T), without copying
+    the elements. A list of sets is interned into a Corpus first.
+
+    Example:
+
+    sets = [{'A', 'B'}, {'B', 'C'}, {'C'}]
+    A = [[1, 0, 0],      row_elements = ['A', 'B', 'C']
+         [1, 1, 0],      column_sets  = [0, 1, 2]
+         [0, 1, 1]]
+
+    :param sets: collection of sets (list of sets or Corpus); = sets_universe
+    :param elements: optional set of all elements, e.g. wds_universe; elements not contained in any set get
+                     an (empty) row as well. Ignored for a Corpus, which has all its words interned already.
+    :param format: "csr" or "csc"; format of the returned matrix
+    :return: the incidence matrix (elements x sets) as scipy.sparse matrix with int32 entries,
+             row_elements: list; the element of each row (word IDs for a Corpus, words otherwise),
+             column_sets: int64 array; the index of the set of each column in sets
+    """
+    print("Building the incidence matrix...")
+    if isinstance(sets, Corpus):
+        corpus = sets
+        row_elements = list(range(corpus.universe_size))
+    else:
+        corpus = Corpus.from_sets(sets, elements)
+        row_elements = corpus.vocabulary
+
+    # The corpus is the CSR matrix A^T (sets x elements); its transpose is the CSC matrix A
+    set_element_matrix = sparse.csr_matrix((np.ones(len(corpus.elements), dtype=np.int32), corpus.elements, corpus.offsets),
+                                           shape=(len(corpus), corpus.universe_size))
+    matrix = set_element_matrix.T
+    if format == "csr":
+        matrix = matrix.tocsr()
+    elif format == "csc":
+        matrix = matrix.tocsc()
+    else:
+        raise ValueError("Unknown format " + repr(format) + ", expected 'csr' or 'csc'")
+
+    return matrix, row_elements, np.arange(len(corpus), dtype=np.int64)
+
+
+def matrix_greedy(sets, batch_size=64, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
+    """
+    The classic greedy algorithm for the set cover problem (see lazy_greedy()) on the incidence matrix.
+
+    The marginal gains of all sets are computed at once as sparse matrix-vector product A^T u, with u the 0/1
+    mask of the uncovered elements. Since gains only shrink, the gains of such a product are upper bounds
+    afterwards: up to batch_size sets are taken in descending order of these gains, each one re-evaluated
+    on the current mask and selected as long as its gain is still at least the bound of the next set.
+    Then the gains are recomputed by the next product. Hence the result is a greedy solution, while the
+    expensive part runs in scipy's sparse kernels.
+
+    :param sets: collection of sets (list of sets or Corpus); only read
+    :param batch_size: maximum amount of sets selected per matrix-vector product
+    :param target_coverage: fraction of the elements that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: solution set containing a sub-collection of indices of sets; <class 'set'>
+    """
+
+    print("+---------------+")
+    print("| Matrix Greedy |")
+    print("+---------------+\n")
+
+    """
+    Initialization & Pre-processes
+    """
+    print("Initialization.")
+
+    matrix, _, column_sets = build_incidence_matrix(sets, format="csc")
+    # Row i of set_element_matrix holds the elements of set i
+    set_element_matrix = matrix.T.tocsr()
+    indptr, indices = set_element_matrix.indptr, set_element_matrix.indices
+
+    # Every element occurring in a set gets covered
+    uncovered = (np.asarray(matrix.sum(axis=1)).ravel() > 0).astype(np.int32)
+    amount_uncovered_elements = int(uncovered.sum())
+    # Partial cover: the loop ends as soon as at most this many elements are uncovered
+    amount_uncovered_allowed = amount_uncovered_elements - compute_coverage_target(amount_uncovered_elements, target_coverage)
+
+    solution_indices = set()
+
+    """
+    Main Algorithm
+    """
+    print("\nLoop.")
+    products = 0
+    while amount_uncovered_elements > amount_uncovered_allowed and \
+            (max_sets is None or len(solution_indices) < max_sets):
+        gains = set_element_matrix @ uncovered
+        products += 1
+
+        # The batch_size + 1 sets with the highest gains, descending; the last one only serves as bound
+        k = min(batch_size + 1, len(gains))
+        candidates = np.argpartition(-gains, k - 1)[:k]
+        candidates = candidates[np.argsort(-gains[candidates], kind="stable")]
+
+        for c in range(min(batch_size, len(candidates))):
+            set_i = candidates[c]
+            elements_i = indices[indptr[set_i]:indptr[set_i + 1]]
+            gain = int(uncovered[elements_i].sum())
+            bound = gains[candidates[c + 1]] if c + 1 < len(candidates) else 0
+            if gain == 0 or gain < bound or amount_uncovered_elements <= amount_uncovered_allowed or \
+                    (max_sets is not None and len(solution_indices) >= max_sets):
+                break
+
+            solution_indices.add(int(column_sets[set_i]))
+            uncovered[elements_i] = 0
+            amount_uncovered_elements -= gain
+
+    if print_logs:
+        print("Amount of indices in Matrix-Greedy-Solution: ", len(solution_indices))
+        print("Matrix-vector products: ", products)
+
+    if remove_redundant is not None:
+        solution_indices, _ = remove_redundant_sets(sets, solution_indices, remove_redundant, print_logs=print_logs)
+
+    return solution_indices
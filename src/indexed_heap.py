@@ -0,0 +1,113 @@
+class IndexedMinHeap(object):
+    """
+    Binary min-heap of items with keys, which also knows the position of every item.
+    Hence the key of an item can be changed and an item can be removed in O(log n), next to push and pop.
+
+    Example:
+
+    heap = IndexedMinHeap()
+    heap.push('A', 3.0)
+    heap.push('B', 1.5)
+    heap.update('A', 0.5)
+    heap.pop()  # -> ('A', 0.5)
+
+    """
+
+    def __init__(self):
+        self.heap = list()       # (key, item)
+        self.position = dict()   # item -> index in heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def key(self, item):
+        return self.heap[self.position[item]][0]
+
+    def peek(self):
+        """
+        :return: (item, key) with the lowest key, without removing it
+        """
+        key, item = self.heap[0]
+        return item, key
+
+    def push(self, item, key):
+        """
+        Insert an item; if it is already contained, its key is updated.
+        """
+        if item in self.position:
+            self.update(item, key)
+            return
+        self.heap.append((key, item))
+        self.position[item] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """
+        Remove the item with the lowest key.
+        :return: (item, key)
+        :raise IndexError: if the heap is empty
+        """
+        key, item = self.heap[0]
+        self.remove(item)
+        return item, key
+
+    def update(self, item, key):
+        """
+        Change the key of a contained item.
+        """
+        i = self.position[item]
+        old_key = self.heap[i][0]
+        self.heap[i] = (key, item)
+        if key < old_key:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, item):
+        """
+        Remove a contained item.
+        :raise KeyError: if the item is not contained
+        """
+        i = self.position.pop(item)
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.position[last[1]] = i
+            if i > 0 and last < self.heap[(i - 1) // 2]:
+                self._sift_up(i)
+            else:
+                self._sift_down(i)
+
+    def _sift_up(self, i):
+        heap = self.heap
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) // 2
+            if not entry < heap[parent]:
+                break
+            heap[i] = heap[parent]
+            self.position[heap[i][1]] = i
+            i = parent
+        heap[i] = entry
+        self.position[entry[1]] = i
+
+    def _sift_down(self, i):
+        heap = self.heap
+        entry = heap[i]
+        size = len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[i] = heap[child]
+            self.position[heap[i][1]] = i
+            i = child
+        heap[i] = entry
+        self.position[entry[1]] = i
@@ -0,0 +1,109 @@
+import heapq
+
+from src.bitsets import popcount, to_bitsets, union_bitset
+from src.postprocesses import remove_redundant_sets
+from src.preprocesses import compute_coverage_target, count_coverable_elements
+
+
+def lazy_greedy(sets, use_bitsets=False, target_coverage=1.0, max_sets=None, remove_redundant=None, print_logs=False):
+    """
+    The classic greedy algorithm for the set cover problem: repeatedly select the set which covers the most
+    uncovered elements. It is the exact greedy the disk-friendly greedy approximates.
+
+    This algorithm was found in:
+        Chvatal, V. (1979). A greedy heuristic for the set-covering problem.
+        Mathematics of operations research, 4(3), 233-235.
+    The marginal gains are evaluated lazily as in the CELF algorithm of:
+        Leskovec, J., Krause, A., Guestrin, C., Faloutsos, C., VanBriesen, J., & Glance, N. (2007).
+        Cost-effective outbreak detection in networks. In Proceedings of the 13th ACM SIGKDD (pp. 420-429).
+    Marginal gains only shrink while elements get covered. So a gain in the max-heap is an upper bound of
+    the current one and a set has to be re-evaluated only when it reaches the top of the heap.
+
+    :param sets: collection of sets (list of sets or Corpus); only read
+    :param use_bitsets: if set true, the sets and the covered elements are packed into bitsets (see to_bitsets()),
+                        so a marginal gain is one popcount of Si & ~C. Falls back to sets if the bitsets
+                        would not fit into memory.
+    :param target_coverage: fraction of the elements that has to be covered; the solver stops as soon as it is met
+    :param max_sets: optional maximum amount of sets in the solution (maximum coverage); the solver stops when
+                     it is reached
+    :param remove_redundant: if given, redundant sets are removed from the solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: solution set containing a sub-collection of indices of sets; <class 'set'>
+    """
+
+    print("+-------------+")
+    print("| Lazy Greedy |")
+    print("+-------------+\n")
+
+    """
+    Initialization & Pre-processes
+    """
+    print("Initialization.")
+
+    bitsets = to_bitsets(sets) if use_bitsets else None
+    if use_bitsets and bitsets is None:
+        print("Universe too large for bitsets; using sets.")
+
+    # Every element occurring in a set gets covered
+    if bitsets is not None:
+        amount_uncovered_elements = popcount(union_bitset(bitsets))
+    else:
+        amount_uncovered_elements = count_coverable_elements(sets)
+
+    # Partial cover: the loop ends as soon as at most this many elements are uncovered
+    amount_uncovered_allowed = amount_uncovered_elements - compute_coverage_target(amount_uncovered_elements, target_coverage)
+
+    solution_indices = set()
+    covered_elements = set()
+    covered_bitset = 0
+
+    # Max-heap of (-marginal gain, set index); initially the gain of a set is its size
+    heap = [(-len(sets[i]), i) for i in range(len(sets)) if len(sets[i]) > 0]
+    heapq.heapify(heap)
+
+    """
+    Main Algorithm
+    """
+    print("\nLoop.")
+    evaluations = 0
+    while amount_uncovered_elements > amount_uncovered_allowed and heap and \
+            (max_sets is None or len(solution_indices) < max_sets):
+        negative_gain, set_i = heapq.heappop(heap)
+
+        # Re-evaluate the marginal gain of the top set
+        if bitsets is not None:
+            residual = bitsets[set_i] & ~covered_bitset
+            gain = popcount(residual)
+        else:
+            gain = 0
+            for element in sets[set_i]:
+                if element not in covered_elements:
+                    gain += 1
+        evaluations += 1
+
+        if gain == 0:
+            continue
+
+        # If the gain is still at least as big as the (upper bound of the) next best gain, the set is the best one
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, set_i))
+            continue
+
+        solution_indices.add(set_i)
+        if bitsets is not None:
+            covered_bitset |= residual
+        else:
+            for element in sets[set_i]:
+                if element not in covered_elements:
+                    covered_elements.add(element)
+        amount_uncovered_elements -= gain
+
+    if print_logs:
+        print("Amount of indices in Lazy-Greedy-Solution: ", len(solution_indices))
+        print("Evaluations of marginal gains: ", evaluations)
+
+    if remove_redundant is not None:
+        solution_indices, _ = remove_redundant_sets(sets, solution_indices, remove_redundant, print_logs=print_logs)
+
+    return solution_indices
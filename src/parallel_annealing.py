@@ -0,0 +1,160 @@
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from src.preprocesses import build_inverted_index, compute_set_lengths, count_element_coverage
+from src.simulated_annealing import simulated_annealing
+
+# The read-only collection of a worker process and the structures built from it once, see init_worker()
+shared_sets = None
+shared_inverted_index = None
+shared_set_lengths = None
+
+
+def parallel_tempering(sets, elements, predefined_solution, running_time, n_chains=None, temps=None, exchange_interval=10, broadcast_interval=5, neighbourhood_scale=0.001, search_depth=2, temp_length=5, full_local_search=False, seed=None, print_logs=False):
+    """
+    Run several simulated annealing chains at different, fixed temperatures in a process pool (parallel tempering).
+
+    The chains run in rounds of exchange_interval seconds. Each chain continues the next round from its
+    current solution (not from its best one), so a hot chain may keep an inferior solution. After each round
+    - neighbouring chains (by temperature) swap their current solutions with the probability
+          min(1, exp((cost_i - cost_j) * (1/temp_i - 1/temp_j))) ,
+      so good solutions move to the cold chains and the hot chains keep exploring, and
+    - every broadcast_interval rounds the best solution found so far is handed to the coldest chain.
+    The best solution of all chains is tracked separately. All chains share one time budget, running_time.
+
+    The collection is handed to each worker process once, when the pool starts; with the fork start method
+    (Linux) the workers share its memory with the main process. The inverted index and the set lengths are
+    built once per worker, and the coverage counts of a chain travel with its solution.
+
+    :param sets: collection of sets; = sets_universe or its Corpus; only read
+    :param elements: elements that need to be covered
+    :param predefined_solution: feasible solution every chain starts with
+    :param running_time: maximum computation time of the whole ensemble in seconds
+    :param n_chains: number of chains (and worker processes); the number of CPUs if None
+    :param temps: list of the temperatures of the chains; a geometric ladder from 0.05 to 2.0 if None
+    :param exchange_interval: seconds between two exchanges of solutions
+    :param broadcast_interval: number of rounds between two broadcasts of the best solution
+    :param neighbourhood_scale: see simulated_annealing()
+    :param search_depth: see simulated_annealing()
+    :param temp_length: see simulated_annealing()
+    :param full_local_search: see simulated_annealing()
+    :param seed: seed of the random number generators of the exchanges and of the chains
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: best solution set containing a sub-collection of indices of sets and the total amount of iterations
+    """
+
+    print("+--------------------+")
+    print("| Parallel Tempering |")
+    print("+--------------------+\n")
+
+    """
+    Initialization
+    """
+    if temps is None:
+        if n_chains is None:
+            n_chains = os.cpu_count() or 1
+        temps = temperature_ladder(n_chains)
+    temps = sorted(temps)
+    n_chains = len(temps)
+
+    rng = random.Random(seed)
+    amount_elements_covered_dict = count_element_coverage(sets, predefined_solution, elements)
+    # Current solution and its coverage counts of each chain
+    chain_solutions = [set(predefined_solution) for _ in range(n_chains)]
+    chain_counts = [dict(amount_elements_covered_dict) for _ in range(n_chains)]
+    best_solution = set(predefined_solution)
+    iterations = 0
+
+    if print_logs:
+        print("Chains: ", n_chains, " Temperatures: ", [round(t, 4) for t in temps])
+
+    start_time = time.time()
+    rounds = 0
+    with multiprocessing.Pool(n_chains, initializer=init_worker, initargs=(sets, full_local_search)) as pool:
+        while True:
+            remaining_time = running_time - (time.time() - start_time)
+            if remaining_time <= 0:
+                break
+
+            # 1. Run all chains for one round
+            round_time = min(exchange_interval, remaining_time)
+            tasks = [(chain_solutions[c], chain_counts[c], temps[c], round_time, rng.getrandbits(32),
+                      neighbourhood_scale, search_depth, temp_length, full_local_search)
+                     for c in range(n_chains)]
+            results = pool.map(run_chain, tasks)
+            rounds += 1
+
+            for c in range(n_chains):
+                chain_best, chain_solutions[c], chain_counts[c], chain_iterations = results[c]
+                iterations += chain_iterations
+                if len(chain_best) < len(best_solution):
+                    best_solution = set(chain_best)
+                    if print_logs:
+                        print("New best solution with", len(best_solution), "sets from chain at temperature", round(temps[c], 4))
+
+            # 2. Replica exchange of the current solutions between neighbouring temperatures
+            for c in range(n_chains - 1):
+                delta = (len(chain_solutions[c]) - len(chain_solutions[c + 1])) * (1 / temps[c] - 1 / temps[c + 1])
+                if delta >= 0 or math.exp(delta) > rng.random():
+                    chain_solutions[c], chain_solutions[c + 1] = chain_solutions[c + 1], chain_solutions[c]
+                    chain_counts[c], chain_counts[c + 1] = chain_counts[c + 1], chain_counts[c]
+
+            # 3. Broadcast the best solution to the coldest chain
+            if rounds % broadcast_interval == 0 and len(best_solution) < len(chain_solutions[0]):
+                chain_solutions[0] = set(best_solution)
+                chain_counts[0] = count_element_coverage(sets, best_solution, elements)
+
+    if print_logs:
+        print("Rounds: ", rounds, " Iterations of all chains: ", iterations)
+        print("Amount of indices in best solution: ", len(best_solution))
+
+    return best_solution, iterations
+
+
+def temperature_ladder(n_chains, temp_min=0.05, temp_max=2.0):
+    """
+    :param n_chains: number of temperatures
+    :param temp_min: lowest temperature
+    :param temp_max: highest temperature
+    :return: list of n_chains geometrically spaced temperatures from temp_min to temp_max
+    """
+    if n_chains == 1:
+        return [temp_min]
+    factor = (temp_max / temp_min) ** (1 / (n_chains - 1))
+    return [temp_min * factor ** c for c in range(n_chains)]
+
+
+def init_worker(sets, full_local_search=False):
+    """
+    Initializer of the worker processes; keeps the read-only collection for all chains run by this worker.
+    For full_local_search, the inverted index and the set lengths are built here once.
+    """
+    global shared_sets, shared_inverted_index, shared_set_lengths
+    shared_sets = sets
+    if full_local_search:
+        shared_inverted_index = build_inverted_index(sets)
+        shared_set_lengths = compute_set_lengths(sets)
+
+
+def run_chain(task):
+    """
+    Run one chain for one round at a fixed temperature in a worker process.
+    :param task: (current solution, its coverage counts, temperature, running time, seed, neighbourhood_scale,
+                  search_depth, temp_length, full_local_search)
+    :return: best solution of the round, current solution at the end of the round and its coverage counts,
+             amount of iterations
+    """
+    solution, amount_elements_covered_dict, temp, running_time, seed, neighbourhood_scale, search_depth, temp_length, \
+        full_local_search = task
+    final_state = dict()
+    best_solution, iterations = simulated_annealing(shared_sets, solution, amount_elements_covered_dict, running_time,
+                                                    neighbourhood_scale=neighbourhood_scale, search_depth=search_depth,
+                                                    temp=temp, temp_length=temp_length, cooling_factor=1.0,
+                                                    full_local_search=full_local_search, seed=seed,
+                                                    inverted_index=shared_inverted_index,
+                                                    set_lengths=shared_set_lengths, final_state=final_state,
+                                                    print_header=False)
+    return best_solution, final_state["solution"], final_state["amount_elements_covered_dict"], iterations
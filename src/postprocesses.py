@@ -0,0 +1,70 @@
+import random
+
+from src.preprocesses import count_element_coverage
+
+# Orders in which remove_redundant_sets() tries the sets of a solution
+REDUNDANCY_ORDERS = ("largest", "cost_ratio", "random")
+
+
+def remove_redundant_sets(collection, solution_indices, order="largest", coverage_counts=None, rng=None, print_logs=False):
+    """
+    Remove redundant sets from a solution: a set is redundant if every element of it is covered by another set of
+    the solution as well (coverage count >= 2). The sets are tried once in the given order; a removed set lowers the
+    counts of its elements. Sets kept stay non-redundant since counts only go down, so after one pass of
+    O(total size of the solution sets) no set of the solution is redundant anymore.
+
+    Example:
+
+    collection = [{'A', 'B'}, {'B', 'C'}, {'A', 'B', 'C'}], solution_indices = {0, 1, 2}
+    order="largest"   -> {0, 1} (set 2 is tried first and removed)
+
+    :param collection: the sets_universe (list of sets, Corpus or dict of set index -> set); only read
+    :param solution_indices: iterable containing indices of sets (in a solution) which is represents a sub-collection of collection
+    :param order: order in which the sets are tried:
+                  "largest"     largest sets first
+                  "cost_ratio"  sets with the lowest share of the coverage first, i.e. the lowest sum of
+                                1 / coverage count over their elements (sets covering mostly elements that are
+                                covered many times anyway)
+                  "random"      random order
+    :param coverage_counts: dict of how often each element is covered by the solution, see count_element_coverage();
+                            it is updated in place. Computed if not given.
+    :param rng: random number generator for order="random", an instance of random.Random or the random module
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: the solution without redundant sets; <class 'set'> and the dict of coverage counts of it
+    """
+    print("Removing redundant sets from solution...")
+
+    solution_indices = list(solution_indices)
+    if coverage_counts is None:
+        coverage_counts = count_element_coverage(collection, solution_indices)
+
+    if order == "largest":
+        solution_indices.sort(key=lambda set_i: len(collection[set_i]), reverse=True)
+    elif order == "cost_ratio":
+        share = dict()
+        for set_i in solution_indices:
+            share[set_i] = sum(1 / coverage_counts[element] for element in collection[set_i])
+        solution_indices.sort(key=lambda set_i: share[set_i])
+    elif order == "random":
+        (rng or random).shuffle(solution_indices)
+    else:
+        raise ValueError("Unknown order " + repr(order) + ", expected one of " + str(REDUNDANCY_ORDERS))
+
+    reduced_solution = set()
+    for set_i in solution_indices:
+        redundant = True
+        for element in collection[set_i]:
+            if coverage_counts[element] < 2:
+                redundant = False
+                break
+        if redundant:
+            for element in collection[set_i]:
+                coverage_counts[element] -= 1
+        else:
+            reduced_solution.add(set_i)
+
+    if print_logs:
+        print("Removed redundant sets: ", len(solution_indices) - len(reduced_solution),
+              " Amount of indices in solution: ", len(reduced_solution))
+
+    return reduced_solution, coverage_counts
@@ -1,6 +1,10 @@
 import collections
+import math
 
-from text_coverage_data import sets_universe
+import numpy as np
+
+from src.corpus import Corpus
+from text_coverage_data import load_dataset
 
 
 def build_inverted_index(set_collection, print_output=False):
@@ -20,9 +24,17 @@ def build_inverted_index(set_collection, print_output=False):
     """
     print("Building an Inverted Index of given sets...")
     index = collections.defaultdict(list)
-    for i in range(len(set_collection)):
-        for word in set_collection[i]:
-            index[word].append(i)
+    if isinstance(set_collection, Corpus):
+        # Sorting the flat element array groups all occurrences of a word; stable, so set indices stay ascending
+        set_indices = np.repeat(np.arange(len(set_collection)), set_collection.set_lengths())
+        order = np.argsort(set_collection.elements, kind='stable')
+        words, starts = np.unique(set_collection.elements[order], return_index=True)
+        for word, occurrences in zip(words.tolist(), np.split(set_indices[order], starts[1:])):
+            index[word] = occurrences.tolist()
+    else:
+        for i in range(len(set_collection)):
+            for word in set_collection[i]:
+                index[word].append(i)
 
     if print_output:
         print("Inverted Index defaultdict:")
@@ -69,6 +81,38 @@ def get_set_list_of_solution_indices(collection, solution_indices):
     return sets
 
 
+def count_element_coverage(collection, solution_indices, elements=None):
+    """
+    Counting how often each element is covered by the sets of a solution
+    :param collection: the sets_universe
+    :param solution_indices: iterable containing indices of sets (in a solution) which is represents a sub-collection of collection
+    :param elements: elements that need to be covered; they are part of the result even if they are not covered (count 0)
+    :return: dict(key: element, value: amount of sets in the solution containing the element)
+    """
+    amount_elements_covered_dict = dict()
+    if elements is not None:
+        for element in elements:
+            amount_elements_covered_dict[element] = 0
+    for i in solution_indices:
+        for element in collection[i]:
+            amount_elements_covered_dict[element] = amount_elements_covered_dict.get(element, 0) + 1
+    return amount_elements_covered_dict
+
+
+def count_coverable_elements(set_collection):
+    """
+    Count the distinct elements contained in the sets of a collection, i.e. the elements which can be covered.
+    :param set_collection: collection of sets (list of sets or Corpus)
+    :return: amount of distinct elements as int
+    """
+    if isinstance(set_collection, Corpus):
+        return int(np.unique(set_collection.elements).size)
+    coverable_elements = set()
+    for i in range(len(set_collection)):
+        coverable_elements.update(set_collection[i])
+    return len(coverable_elements)
+
+
 def compute_set_lengths(set_collection):
     """
     Compute lengths for each set in set_collection and save it in an list.
@@ -76,6 +120,8 @@ def compute_set_lengths(set_collection):
     :return: list containing the corresponding lengths; indices are the same as in set_collection
     """
     print("Compute lengths of the sets...")
+    if isinstance(set_collection, Corpus):
+        return set_collection.set_lengths().tolist()
     set_lengths = list()
     for i in range(len(set_collection)):
         set_lengths.append(len(set_collection[i]))
@@ -124,6 +170,256 @@ def sort_collection_by_set_sizes_with_comparison_list(set_collection):
     return sorted_list, comparison_list
 
 
+def sort_set_indices_by_set_sizes(set_collection):
+    """
+    Sort the indices of the sets of a given collection by the size of the sets; sets of the same size keep
+    their order. Unlike sort_collection_by_set_sizes_with_comparison_list(), no sorted copy of the collection
+    is built.
+    :param set_collection: collection of sets (list of sets or Corpus)
+    :return: comparison list (index: position in size order, value: original index of the set)
+    """
+    return np.argsort(np.asarray(compute_set_lengths(set_collection), dtype=np.int64), kind="stable").tolist()
+
+
+def build_first_covering_set_index(inverted_index, comparison_list):
+    """
+    Computes for every element the position of the first set in size order that contains it,
+    i.e. the set a linear scan over the sorted collection would stop at.
+    :param inverted_index: inverted index of the unsorted collection, see build_inverted_index()
+    :param comparison_list: list mapping the positions in the sorted collection to the original indices,
+                            see sort_set_indices_by_set_sizes()
+    :return: dict(key: element, value: position of its first covering set in the sorted collection)
+    """
+    print("Building an index of the first covering set of each element...")
+    sorted_positions = [0] * len(comparison_list)
+    for position, original_index in enumerate(comparison_list):
+        sorted_positions[original_index] = position
+
+    first_covering_set_index = dict()
+    for element, occurrences in inverted_index.items():
+        first_covering_set_index[element] = min(sorted_positions[i] for i in occurrences)
+    return first_covering_set_index
+
+
+def find_dominated_sets(restricted_sets, inverted_index):
+    """
+    Find the sets which are a strict subset of another set. The candidates for supersets of a set are only
+    the sets containing its rarest element, found via the inverted index.
+    :param restricted_sets: dict(key: set index, value: set of elements); sets must be pairwise distinct
+    :param inverted_index: dict(key: element, value: iterable of the indices of the sets in restricted_sets
+                           containing it)
+    :return: set of the indices of the dominated sets
+    """
+    dominated = set()
+    for set_i, elements_i in restricted_sets.items():
+        if len(elements_i) == 0:
+            continue
+        rarest_element = min(elements_i, key=lambda element: len(inverted_index[element]))
+        for set_j in inverted_index[rarest_element]:
+            if len(restricted_sets[set_j]) > len(elements_i) and elements_i <= restricted_sets[set_j]:
+                dominated.add(set_i)
+                break
+    return dominated
+
+
+def remove_duplicate_and_dominated_sets(set_collection, print_logs=False):
+    """
+    Reduce a collection to the sets which can be part of an optimal solution of the unit-cost set cover:
+    all copies of a set but the first one, empty sets and sets which are a strict subset of another set
+    (dominated sets) are removed. Every element stays covered by at least one remaining set.
+
+    Duplicates are found by hashing the sets in a canonical form (the sorted word IDs for a Corpus),
+    dominated sets by find_dominated_sets().
+
+    Example:
+
+    set_collection = [{'A', 'B'}, {'B'}, {'A', 'B'}, {'C'}]
+    -> reduced collection [{'A', 'B'}, {'C'}] and comparison list [0, 3]
+
+    :param set_collection: collection of sets (list of sets or Corpus)
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: reduced collection (a Corpus for a Corpus, a list of sets otherwise) and
+             comparison list (index: new index of a set, value: original index), see map_solution_to_original()
+    """
+    print("Removing duplicate and dominated sets...")
+    is_corpus = isinstance(set_collection, Corpus)
+
+    # 1. Duplicates and empty sets; the first copy of a set is kept
+    first_copies = dict()
+    for i in range(len(set_collection)):
+        if is_corpus:
+            canonical = set_collection.set_ids(i).tobytes()
+        else:
+            canonical = frozenset(set_collection[i])
+        if len(canonical) > 0 and canonical not in first_copies:
+            first_copies[canonical] = i
+    unique_indices = sorted(first_copies.values())
+
+    # 2. Dominated sets
+    restricted_sets = {i: set(set_collection[i]) for i in unique_indices}
+    inverted_index = collections.defaultdict(list)
+    for i in unique_indices:
+        for element in restricted_sets[i]:
+            inverted_index[element].append(i)
+    dominated = find_dominated_sets(restricted_sets, inverted_index)
+
+    comparison_list = [i for i in unique_indices if i not in dominated]
+    if is_corpus:
+        reduced_collection = set_collection.select(comparison_list)
+    else:
+        reduced_collection = [set_collection[i] for i in comparison_list]
+
+    if print_logs:
+        print("Sets: ", len(set_collection), " duplicates and empty: ", len(set_collection) - len(unique_indices),
+              " dominated: ", len(dominated), " remaining: ", len(comparison_list))
+
+    return reduced_collection, comparison_list
+
+
+def map_solution_to_original(solution_indices, comparison_list):
+    """
+    :param solution_indices: indices of sets of a reduced collection
+    :param comparison_list: comparison list of the reduced collection (index: new index, value: original index)
+    :return: set of the corresponding indices of the original collection
+    """
+    return {comparison_list[i] for i in solution_indices}
+
+
+def kernelize(set_collection, elements=None, print_logs=False):
+    """
+    Reduce a set cover instance to its core by rules which keep every optimal solution optimal,
+    repeated until none of them changes anything anymore:
+
+    1. Forced sets: an element contained in only one set forces this set into every feasible solution.
+       The set is fixed and the elements it covers are removed from the instance.
+    2. Element dominance: if every set containing element e1 also contains element e2, any set covering e1
+       covers e2 as well; e2 is removed (of elements contained in the same sets, one is kept).
+    3. Set dominance: removing elements may turn sets into duplicates or strict subsets of other sets;
+       those are removed as in remove_duplicate_and_dominated_sets(), and so are empty sets.
+
+    Removed sets may create new forced sets and so on. Elements which are contained in no set cannot be
+    covered and are left out.
+
+    Example:
+
+    set_collection = [{'A', 'B'}, {'B', 'C'}, {'C', 'D'}, {'D'}]
+    'A' forces set 0, 'B' gets covered; set 3 is a subset of set 2 and removed; now 'C' and 'D' force set 2.
+    -> core collection [], core elements set(), comparison list [], fixed solution {0, 2}
+
+    :param set_collection: collection of sets (list of sets or Corpus)
+    :param elements: elements that need to be covered (word IDs for a Corpus); all elements of the sets if None
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: core collection (a Corpus for a Corpus, a list of sets otherwise) of the remaining sets, restricted
+             to the remaining elements,
+             the remaining elements (core elements) as set,
+             comparison list (index: index in the core collection, value: original index),
+             fixed solution: set of the original indices of the forced sets.
+             A solution of the whole instance is  fixed solution | map_solution_to_original(core solution, comparison list)
+    """
+    print("Kernelization of the instance...")
+
+    # Sets restricted to the elements which still need to be covered; inverted index over those
+    restricted_sets = dict()
+    for i in range(len(set_collection)):
+        restricted_sets[i] = set(set_collection[i]) if elements is None else set(set_collection[i]) & elements
+    covering_sets = collections.defaultdict(set)
+    for i, elements_i in restricted_sets.items():
+        for element in elements_i:
+            covering_sets[element].add(i)
+    covering_sets = dict(covering_sets)
+    uncoverable = 0 if elements is None else len(elements) - len(covering_sets)
+
+    def remove_element(element):
+        for set_i in covering_sets.pop(element):
+            restricted_sets[set_i].discard(element)
+
+    def remove_set(set_i):
+        for element in restricted_sets.pop(set_i):
+            covering_sets[element].discard(set_i)
+
+    fixed_solution = set()
+    removed_elements = 0
+    removed_sets = 0
+    rounds = 0
+    changed = True
+    while changed:
+        changed = False
+        rounds += 1
+
+        # 1. Forced sets
+        forced = {next(iter(occurrences)) for occurrences in covering_sets.values() if len(occurrences) == 1}
+        for set_i in forced:
+            fixed_solution.add(set_i)
+            for element in list(restricted_sets[set_i]):
+                remove_element(element)
+                removed_elements += 1
+            del restricted_sets[set_i]
+        changed = changed or len(forced) > 0
+
+        # 2. Element dominance; all elements e2 with a superset of sets are among the elements of the
+        # smallest set containing e1
+        dominated_elements = set()
+        for element in covering_sets:
+            if element in dominated_elements:
+                continue
+            occurrences = covering_sets[element]
+            smallest_set = min(occurrences, key=lambda set_i: len(restricted_sets[set_i]))
+            for other_element in restricted_sets[smallest_set]:
+                if other_element != element and other_element not in dominated_elements \
+                        and len(covering_sets[other_element]) >= len(occurrences) \
+                        and occurrences <= covering_sets[other_element]:
+                    dominated_elements.add(other_element)
+        for element in dominated_elements:
+            remove_element(element)
+        removed_elements += len(dominated_elements)
+        changed = changed or len(dominated_elements) > 0
+
+        # 3. Empty, duplicate and dominated sets
+        first_copies = dict()
+        redundant_sets = set()
+        for set_i in sorted(restricted_sets):
+            canonical = frozenset(restricted_sets[set_i])
+            if len(canonical) == 0 or canonical in first_copies:
+                redundant_sets.add(set_i)
+            else:
+                first_copies[canonical] = set_i
+        for set_i in redundant_sets:
+            remove_set(set_i)
+        dominated_sets = find_dominated_sets(restricted_sets, covering_sets)
+        for set_i in dominated_sets:
+            remove_set(set_i)
+        removed_sets += len(redundant_sets) + len(dominated_sets)
+        changed = changed or len(redundant_sets) > 0 or len(dominated_sets) > 0
+
+    comparison_list = sorted(restricted_sets)
+    core_elements = set(covering_sets)
+    if isinstance(set_collection, Corpus):
+        offsets = np.zeros(len(comparison_list) + 1, dtype=np.int64)
+        np.cumsum([len(restricted_sets[i]) for i in comparison_list], out=offsets[1:])
+        core_ids = [sorted(restricted_sets[i]) for i in comparison_list]
+        core_collection = Corpus(set_collection.vocabulary, offsets,
+                                 np.fromiter((word_id for ids in core_ids for word_id in ids), dtype=np.int32, count=offsets[-1]))
+    else:
+        core_collection = [restricted_sets[i] for i in comparison_list]
+
+    if print_logs:
+        print("Rounds: ", rounds, " fixed sets: ", len(fixed_solution), " removed sets: ", removed_sets,
+              " removed elements: ", removed_elements, " uncoverable elements: ", uncoverable)
+        print("Core: ", len(comparison_list), " sets, ", len(core_elements), " elements")
+
+    return core_collection, core_elements, comparison_list, fixed_solution
+
+
+def compute_coverage_target(amount_elements, target_coverage=1.0):
+    """
+    :param amount_elements: number of elements that need to be covered
+    :param target_coverage: fraction of them that has to be covered (partial cover)
+    :return: the amount of elements to cover; at least target_coverage * amount_elements
+    """
+    # Rounded first, so e.g. 0.99 * 400 = 396.00000000000006 gives 396
+    return min(amount_elements, math.ceil(round(target_coverage * amount_elements, 9)))
+
+
 def create_set_length_dict(set_collection):
     """
     Builds a dictionary from a collection of sets with the set sizes as keys
@@ -141,6 +437,7 @@ def create_set_length_dict(set_collection):
 
 
 if __name__ == "__main__":
+    wds_universe, sets_universe = load_dataset("reuters")
     sort, comp = sort_collection_by_set_sizes_with_comparison_list(sets_universe)
 
     print("the:", sets_universe[189])
@@ -1,14 +1,27 @@
+import heapq
 import math
+import os
+import pickle
 import random
 import time
-from collections import defaultdict
-from copy import deepcopy
+from array import array
+from collections import namedtuple
 
+from src.indexed_heap import IndexedMinHeap
+from src.postprocesses import remove_redundant_sets
 from src.preprocesses import *
-from text_coverage_data import sets_universe
+from src.solution_state import SolutionState
+from text_coverage_data import load_dataset
 
+# Entries of the undo log of a move; see undo_moves()
+ADDED = 1
+REMOVED = -1
 
-def simulated_annealing(sets, predefined_solution, amount_elements_covered_dict, running_time, neighbourhood_scale=0.001, search_depth=2, temp=1.3, temp_length=5, cooling_factor=0.9, print_logs=False):
+# Version of the checkpoint files written by save_checkpoint()
+CHECKPOINT_VERSION = 1
+
+
+def simulated_annealing(sets, predefined_solution, amount_elements_covered_dict, running_time, neighbourhood_scale=0.001, search_depth=2, temp=1.3, temp_length=5, cooling_factor=0.9, full_local_search=False, seed=None, checkpoint_path=None, checkpoint_interval=60, resume_from=None, target_coverage=1.0, max_sets=None, inverted_index=None, set_lengths=None, final_state=None, callback=None, trace=None, remove_redundant=None, print_header=True, print_logs=False):
     """
     Find a feasible solution for the set cover problem with greedy heuristic and optimize the solution via
     simulated annealing.
@@ -17,10 +30,63 @@ def simulated_annealing(sets, predefined_solution, amount_elements_covered_dict,
         Jacobs, L. W., & Brusco, M. J. (1995). Note: A local‐search heuristic for large set‐covering problems.
         Naval Research Logistics (NRL), 42(7), 1129-1140.
 
-    :param sets: collection of len_set_collection subsets / and a copy of it; = sets_universe
+    Runs iter_simulated_annealing() to its end; see there for the parameters.
+
+    :param callback: optional function called with the AnnealingProgress of the start and of each new best solution
+    :param trace: optional list; (seconds elapsed, iterations, cost) of the start and of each new best solution
+                  is appended to it, i.e. a time-to-quality trace of the run
+    :param remove_redundant: if given, redundant sets are removed from the best solution at the end, in this order
+                             ("largest", "cost_ratio" or "random"), see remove_redundant_sets()
+
+    :return: solution set containing a sub-collection of indices of set_collection and the amount of iterations
+    """
+    best_solution = None
+    progress = iter_simulated_annealing(sets, predefined_solution, amount_elements_covered_dict, running_time,
+                                        neighbourhood_scale=neighbourhood_scale, search_depth=search_depth, temp=temp,
+                                        temp_length=temp_length, cooling_factor=cooling_factor,
+                                        full_local_search=full_local_search, seed=seed,
+                                        checkpoint_path=checkpoint_path, checkpoint_interval=checkpoint_interval,
+                                        resume_from=resume_from, target_coverage=target_coverage,
+                                        max_sets=max_sets, inverted_index=inverted_index, set_lengths=set_lengths,
+                                        final_state=final_state, print_header=print_header, print_logs=print_logs)
+    while True:
+        try:
+            record = next(progress)
+        except StopIteration as stop:
+            iterations = stop.value
+            break
+        best_solution = record.solution
+        if trace is not None:
+            trace.append((record.elapsed, record.iterations, record.cost))
+        if callback is not None:
+            callback(record)
+
+    if remove_redundant is not None:
+        best_solution, _ = remove_redundant_sets(sets, best_solution, remove_redundant, print_logs=print_logs)
+    return best_solution, iterations
+
+
+# A new best solution of iter_simulated_annealing(): seconds since the start, iterations so far,
+# cost (amount of sets; amount of uncovered elements with a budget of sets) and the solution set itself
+AnnealingProgress = namedtuple("AnnealingProgress", ["elapsed", "iterations", "cost", "solution"])
+
+
+def iter_simulated_annealing(sets, predefined_solution, amount_elements_covered_dict, running_time, neighbourhood_scale=0.001, search_depth=2, temp=1.3, temp_length=5, cooling_factor=0.9, full_local_search=False, seed=None, checkpoint_path=None, checkpoint_interval=60, resume_from=None, target_coverage=1.0, max_sets=None, inverted_index=None, set_lengths=None, final_state=None, print_header=True, print_logs=False):
+    """
+    Anytime version of simulated_annealing(): a generator which yields an AnnealingProgress for the start solution
+    and for each new best solution, as soon as it is found. The running time is checked before every move, so the
+    generator stops right at the deadline; the caller may also stop iterating at any time and keep the last
+    solution yielded. Its return value (StopIteration.value) is the amount of iterations.
+
+    Each move changes the current solution and its coverage counts in place and records its changes in an
+    undo log; a rejected move is rolled back from that log. The sets are only read and never copied.
+    The current solution is kept as SolutionState, so the cost of a move does not depend on the number of sets.
+
+    :param sets: collection of len_set_collection subsets; = sets_universe or its Corpus; only read
 
     :param predefined_solution: for multiple iterations of testing you can give this method a feasable solution to start with
     :param amount_elements_covered_dict: a dict which saves the numbers, how often each element is covered
+                                     (keyed by word IDs for a Corpus); it is copied, not changed
 
     :param temp: initial temperature - controls the probability of accepting an inferior solution
     :param temp_length: number of iterations at a particular value of the temperature
@@ -29,66 +95,157 @@ def simulated_annealing(sets, predefined_solution, amount_elements_covered_dict,
 
     :param neighbourhood_scale: percentage of sets in tentative solution to be removed at each iteration; magnitude of neighbourhood-search
     :param search_depth: percentage of set cost(=length) that is accepted for new solution at each iteration; control for search-depth
+    :param full_local_search: if set true, the moves are made by local_search_heuristic() as in the paper,
+                              otherwise by local_search_heuristic_simplified()
+
+    :param seed: seed of the random number generator of the run; all random choices are made by it,
+                 so a run is reproducible with the same seed
+    :param checkpoint_path: if given, a checkpoint (see save_checkpoint()) is written to this file every
+                            checkpoint_interval seconds and when the running time is over
+    :param checkpoint_interval: seconds between two checkpoints
+    :param resume_from: path of a checkpoint to continue from; predefined_solution, amount_elements_covered_dict
+                        and temp are then taken from the checkpoint, the time already spent counts towards
+                        running_time. With the same sets and parameters the run continues exactly as the
+                        checkpointed one would have.
+    :param target_coverage: fraction of the elements (the keys of amount_elements_covered_dict) that has to be
+                            covered; the moves only repair the solution up to it, so the solutions searched are
+                            partial covers
+    :param max_sets: optional budget of sets (maximum coverage): a start solution with more sets is trimmed to
+                     max_sets sets by trim_solution(), the moves never add sets beyond the budget and the cost
+                     of a solution is its amount of uncovered elements instead of its amount of sets.
+                     The run stops as soon as at most the elements allowed by target_coverage are uncovered.
+    :param inverted_index: inverted index of sets for full_local_search, see build_inverted_index(); built if not given
+    :param set_lengths: list containing the lengths of all sets for full_local_search; computed if not given
+                        (when annealing the same sets repeatedly, pass inverted_index and set_lengths in)
+    :param final_state: optional dict; when the run ends, the current solution ("solution", set of indices),
+                        its coverage counts ("amount_elements_covered_dict") and its cost ("cost") are stored
+                        in it, so a run can be continued from its current instead of its best solution
+    :param print_header: if set false, the banner of the run is not printed
 
     :param print_logs: prints outputs and parameters of used functions.
 
-    :return: solution set containing a sub-collection of indices of set_collection
+    :return: generator of AnnealingProgress
     """
 
-    print("+---------------------+")
-    print("| Simulated Annealing |")
-    print("+---------------------+\n")
+    if print_header:
+        print("+---------------------+")
+        print("| Simulated Annealing |")
+        print("+---------------------+\n")
 
     """
     Initialization
     """
-    set_collection = deepcopy(sets)
-
-
-    solution = predefined_solution
-    solution_cost = len(solution)
-    solution_elements_covered_dict = amount_elements_covered_dict
-    best_solution = solution
+    set_collection = sets
+    rng = random.Random(seed)
+
+    if resume_from is None:
+        # Working copies; all moves are applied to them in place
+        solution = SolutionState(len(set_collection), predefined_solution)
+        solution_elements_covered_dict = dict(amount_elements_covered_dict)
+        best_solution = solution.to_set()
+        i = 1
+        iterations = 0
+        elapsed = 0.0
+    else:
+        checkpoint = load_checkpoint(resume_from, len(set_collection))
+        solution = checkpoint["solution"]
+        solution_elements_covered_dict = checkpoint["amount_elements_covered_dict"]
+        best_solution = checkpoint["best_solution"]
+        temp = checkpoint["temp"]
+        i = checkpoint["i"]
+        iterations = checkpoint["iterations"]
+        elapsed = checkpoint["elapsed"]
+        rng.setstate(checkpoint["rng_state"])
+        if print_logs:
+            print("Resuming from checkpoint after", iterations, "iterations and", round(elapsed, 2), "seconds")
+
+    # Partial cover: the moves may leave this many elements uncovered
+    allowed_uncovered = len(solution_elements_covered_dict) - compute_coverage_target(len(solution_elements_covered_dict), target_coverage)
+    # Elements with a coverage count of 0; kept up to date by every move and its undo
+    uncovered_elements = get_uncovered_elements(solution_elements_covered_dict)
+
+    if max_sets is not None:
+        # Maximum coverage: the cost is the amount of uncovered elements of at most max_sets sets
+        if resume_from is None and len(solution) > max_sets:
+            trim_solution(set_collection, solution, solution_elements_covered_dict, max_sets, uncovered_elements)
+            best_solution = solution.to_set()
+            best_cost = len(uncovered_elements)
+        elif resume_from is None:
+            best_cost = len(uncovered_elements)
+        else:
+            best_cost = len(get_uncovered_elements(count_element_coverage(set_collection, best_solution,
+                                                                         solution_elements_covered_dict)))
+        solution_cost = len(uncovered_elements)
+    else:
+        solution_cost = len(solution)
+        best_cost = len(best_solution)
+
+    if full_local_search and inverted_index is None:
+        inverted_index = build_inverted_index(set_collection)
+    if full_local_search and set_lengths is None:
+        set_lengths = compute_set_lengths(set_collection)
 
     if print_logs:
         print("Starting simulated annealing with solution size:", solution_cost)
 
-    start_time = time.time()
-    iterations = 0
+    start_time = time.time() - elapsed
+    last_checkpoint_time = time.time()
+    yield AnnealingProgress(elapsed, iterations, best_cost, set(best_solution))
+
     while True:
-        i = 1
         while i <= temp_length:
-            new_solution, new_solution_elements_dict = local_search_heuristic_simplified(set_collection, solution, solution_elements_covered_dict, neighbourhood_scale, print_logs)
-            new_cost = len(new_solution)
+            if (time.time() - start_time) > running_time or (max_sets is not None and best_cost <= allowed_uncovered):
+                if checkpoint_path is not None:
+                    save_checkpoint(checkpoint_path, solution, best_solution, solution_elements_covered_dict, temp, i,
+                                    iterations, time.time() - start_time, rng)
+                if final_state is not None:
+                    final_state["solution"] = solution.to_set()
+                    final_state["amount_elements_covered_dict"] = solution_elements_covered_dict
+                    final_state["cost"] = solution_cost
+                return iterations
+
+            if checkpoint_path is not None and time.time() - last_checkpoint_time >= checkpoint_interval:
+                save_checkpoint(checkpoint_path, solution, best_solution, solution_elements_covered_dict, temp, i,
+                                iterations, time.time() - start_time, rng)
+                last_checkpoint_time = time.time()
+
+            undo_log = list()
+            if full_local_search:
+                local_search_heuristic(set_collection, solution, solution_elements_covered_dict, neighbourhood_scale, search_depth, print_logs, rng=rng, undo_log=undo_log, uncovered_elements=uncovered_elements, inverted_index=inverted_index, set_lengths=set_lengths, allowed_uncovered=allowed_uncovered, max_sets=max_sets)
+            else:
+                local_search_heuristic_simplified(set_collection, solution, solution_elements_covered_dict, neighbourhood_scale, print_logs, rng=rng, undo_log=undo_log, uncovered_elements=uncovered_elements, allowed_uncovered=allowed_uncovered, max_sets=max_sets)
+            new_cost = len(solution) if max_sets is None else len(uncovered_elements)
             iterations += 1
             delta = new_cost - solution_cost
             if delta <= 0:
-                solution = new_solution
                 solution_cost = new_cost
-                solution_elements_covered_dict = new_solution_elements_dict
-                best_solution = new_solution
-                if print_logs:
-                    print("+-----------------------------+")
-                    print("| New best solution found!    |")
-                    print("| It has ", len(best_solution), " sets.")
-                    print("+-----------------------------+")
+                if new_cost < best_cost:
+                    best_cost = new_cost
+                    best_solution = solution.to_set()
+                    if print_logs:
+                        print("+-----------------------------+")
+                        print("| New best solution found!    |")
+                        print("| It has ", len(best_solution), " sets.")
+                        print("+-----------------------------+")
+                    yield AnnealingProgress(time.time() - start_time, iterations, best_cost, set(best_solution))
 
             else:
                 # When delta is less than zero, then exp( -(-delta) / temp )
                 # 1) if delta is low, the probability for a change of the solution gets high
                 # 2) if temperature is low, the probability for a change of the solution gets high
                 prob = math.pow(math.e, (-delta)/temp)
-                if prob > random.random():
-                    solution = new_solution
+                if prob > rng.random():
                     solution_cost = new_cost
-                    solution_elements_covered_dict = new_solution_elements_dict
                     if print_logs:
                         print("+------------------------------+")
                         print("| Accepted a inferior solution |")
-                        print("| It has ", len(best_solution), " sets.")
+                        print("| It has ", len(solution), " sets.")
                         print("+------------------------------+")
+                else:
+                    undo_moves(set_collection, solution, solution_elements_covered_dict, undo_log, uncovered_elements)
 
             i += 1
+        i = 1
         temp = temp * cooling_factor
 
         if print_logs:
@@ -96,27 +253,183 @@ def simulated_annealing(sets, predefined_solution, amount_elements_covered_dict,
             print("| Cooling temperature down: ", round(temp, 4))
             print("+-------------------------------+")
 
-        if (time.time() - start_time) > running_time:
-            break
-    return best_solution, iterations
 
+def trim_solution(sets, solution, amount_elements_covered_dict, max_sets, uncovered_elements=None):
+    """
+    Remove sets from a solution in place until at most max_sets are left, each time the set whose removal
+    uncovers the fewest elements. Those losses only grow while sets are removed, so they are re-evaluated
+    lazily as the gains in lazy_greedy().
+    :param sets: collection of sets
+    :param solution: SolutionState; changed in place
+    :param amount_elements_covered_dict: coverage counts of the solution; changed in place
+    :param max_sets: maximum amount of sets
+    :param uncovered_elements: optional set of the elements with count 0; changed in place
+    """
+    def loss(set_i):
+        return sum(1 for element in sets[set_i] if amount_elements_covered_dict[element] == 1)
+
+    heap = [(loss(set_i), set_i) for set_i in solution]
+    heapq.heapify(heap)
+    while len(solution) > max_sets:
+        _, set_i = heapq.heappop(heap)
+        current_loss = loss(set_i)
+        if heap and current_loss > heap[0][0]:
+            heapq.heappush(heap, (current_loss, set_i))
+            continue
+        remove_set_from_solution(sets, set_i, solution, amount_elements_covered_dict, uncovered_elements=uncovered_elements)
+
+
+def save_checkpoint(path, solution, best_solution, amount_elements_covered_dict, temp, i, iterations, elapsed, rng):
+    """
+    Write the state of a simulated annealing run to a binary (pickle) file, see iter_simulated_annealing().
+    The file is replaced atomically, so an interrupted write leaves the previous checkpoint intact.
+
+    :param path: path of the checkpoint file
+    :param solution: current solution; SolutionState
+    :param best_solution: best solution found so far; set of indices
+    :param amount_elements_covered_dict: coverage counts of the current solution
+    :param temp: current temperature
+    :param i: number of the next iteration at the current temperature
+    :param iterations: amount of iterations so far
+    :param elapsed: seconds spent so far
+    :param rng: random number generator of the run; its state is saved
+    """
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        # The order of the sets matters for the random choices, so the whole permutation is kept
+        "order": array("i", solution.order),
+        "size": solution.size,
+        "drawn": solution.drawn,
+        "best_solution": array("i", sorted(best_solution)),
+        "amount_elements_covered_dict": amount_elements_covered_dict,
+        "temp": temp,
+        "i": i,
+        "iterations": iterations,
+        "elapsed": elapsed,
+        "rng_state": rng.getstate()
+    }
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as fp:
+        pickle.dump(checkpoint, fp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path, amount_sets=None):
+    """
+    Read a checkpoint written by save_checkpoint().
+    :param path: path of the checkpoint file
+    :param amount_sets: if given, the number of sets the checkpoint has to belong to
+    :return: dict of the saved state; "solution" is the current solution as SolutionState
+    :raise ValueError: if the file has another version or belongs to a collection of another size
+    """
+    with open(path, "rb") as fp:
+        checkpoint = pickle.load(fp)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError("Checkpoint " + path + " has version " + str(checkpoint.get("version")) +
+                         ", expected " + str(CHECKPOINT_VERSION))
+    order = checkpoint.pop("order")
+    if amount_sets is not None and len(order) != amount_sets:
+        raise ValueError("Checkpoint " + path + " belongs to a collection of " + str(len(order)) +
+                         " sets, not " + str(amount_sets))
+
+    solution = SolutionState(0)
+    solution.order = list(order)
+    solution.position = [0] * len(order)
+    for position, set_i in enumerate(solution.order):
+        solution.position[set_i] = position
+    solution.size = checkpoint.pop("size")
+    solution.drawn = checkpoint.pop("drawn")
+    checkpoint["solution"] = solution
+    checkpoint["best_solution"] = set(checkpoint["best_solution"])
+    return checkpoint
+
+
+def add_set_to_solution(sets, set_i, solution, amount_elements_covered_dict, undo_log=None, uncovered_elements=None):
+    """
+    Add a set to the solution in place and count its elements as covered once more.
+    :param sets: collection of sets
+    :param set_i: index of the set to add
+    :param solution: SolutionState or set of indices; changed in place
+    :param amount_elements_covered_dict: coverage counts of the solution; changed in place
+    :param undo_log: optional list the move is recorded in, see undo_moves()
+    :param uncovered_elements: optional set of the elements with count 0; changed in place
+    """
+    solution.add(set_i)
+    for element in sets[set_i]:
+        amount_elements_covered_dict[element] += 1
+        if uncovered_elements is not None and amount_elements_covered_dict[element] == 1:
+            uncovered_elements.discard(element)
+    if undo_log is not None:
+        undo_log.append((ADDED, set_i))
+
+
+def remove_set_from_solution(sets, set_i, solution, amount_elements_covered_dict, undo_log=None, uncovered_elements=None):
+    """
+    Remove a set from the solution in place and count its elements as covered once less.
+    :param sets: collection of sets
+    :param set_i: index of the set to remove
+    :param solution: SolutionState or set of indices; changed in place
+    :param amount_elements_covered_dict: coverage counts of the solution; changed in place
+    :param undo_log: optional list the move is recorded in, see undo_moves()
+    :param uncovered_elements: optional set of the elements with count 0; changed in place
+    """
+    solution.remove(set_i)
+    for element in sets[set_i]:
+        amount_elements_covered_dict[element] -= 1
+        if uncovered_elements is not None and amount_elements_covered_dict[element] == 0:
+            uncovered_elements.add(element)
+    if undo_log is not None:
+        undo_log.append((REMOVED, set_i))
+
+
+def undo_moves(sets, solution, amount_elements_covered_dict, undo_log, uncovered_elements=None):
+    """
+    Roll back the moves recorded in an undo log, latest first. The log is emptied.
+    :param sets: collection of sets
+    :param solution: SolutionState or set of indices; changed in place
+    :param amount_elements_covered_dict: coverage counts of the solution; changed in place
+    :param undo_log: list of (ADDED or REMOVED, set index)
+    :param uncovered_elements: optional set of the elements with count 0; changed in place
+    """
+    while undo_log:
+        action, set_i = undo_log.pop()
+        if action == ADDED:
+            remove_set_from_solution(sets, set_i, solution, amount_elements_covered_dict, uncovered_elements=uncovered_elements)
+        else:
+            add_set_to_solution(sets, set_i, solution, amount_elements_covered_dict, uncovered_elements=uncovered_elements)
 
 
-def local_search_heuristic_simplified(sets, solution, amount_elements_covered_dict, neighbourhood_scale=0.001, print_logs=False):
+def get_uncovered_elements(amount_elements_covered_dict):
+    """
+    :param amount_elements_covered_dict: a dict which saves the numbers, how often each element is covered
+    :return: set of the elements which are covered 0 times
+    """
+    return {element for element, count in amount_elements_covered_dict.items() if count == 0}
+
+
+def local_search_heuristic_simplified(sets, solution, amount_elements_covered_dict, neighbourhood_scale=0.001, print_logs=False, rng=random, undo_log=None, uncovered_elements=None, allowed_uncovered=0, max_sets=None):
     """
     This algorithm is based on:
         Jacobs, L. W., & Brusco, M. J. (1995). Note: A local‐search heuristic for large set‐covering problems.
         Naval Research Logistics (NRL), 42(7), 1129-1140.
 
-    :param sets: collection of len_set_collection subsets / and a copy of it; = sets_universe
+    The move is applied in place: solution and amount_elements_covered_dict are changed.
+
+    :param sets: collection of len_set_collection subsets; = sets_universe or its Corpus; only read
 
-    :param solution: a feasible solution to start with
+    :param solution: a feasible solution to start with; SolutionState (changed in place) or set of indices
     :param amount_elements_covered_dict: a dict which saves the numbers, how often each element is covered
 
     :param neighbourhood_scale: percentage of sets in tentative solution to be removed at each iteration; magnitude of neighbourhood-search
 
     :param print_logs: prints outputs and parameters of used functions.
-    :return: solution set containing a sub-collection of indices of set_collection
+    :param rng: random number generator, an instance of random.Random or the random module
+    :param undo_log: optional list all changes of the move are recorded in, so it can be rolled back by undo_moves()
+    :param uncovered_elements: optional set of the elements with count 0, kept up to date in place;
+                               computed from amount_elements_covered_dict if not given
+    :param allowed_uncovered: amount of elements the repaired solution may leave uncovered (partial cover)
+    :param max_sets: optional budget of sets; the repair stops when the solution has max_sets sets
+    :return: the changed solution as SolutionState and the dict
     """
 
     if print_logs:
@@ -130,20 +443,18 @@ def local_search_heuristic_simplified(sets, solution, amount_elements_covered_di
     Initialization & Pre-processes
     """
 
-    feasible_solution = solution
-    amount_elements_covered_dict = amount_elements_covered_dict
-
-
-    set_collection = deepcopy(sets)
+    set_collection = sets
+    if not isinstance(solution, SolutionState):
+        solution = SolutionState(len(set_collection), solution)
+    solution_size_before = len(solution)
 
 
     # 0.
-    current_solution_list_indices = list(feasible_solution)
+    if uncovered_elements is None:
+        uncovered_elements = get_uncovered_elements(amount_elements_covered_dict)
 
     d = 0
-    D = neighbourhood_scale * len(current_solution_list_indices)
-
-    not_in_solution = list()
+    D = neighbourhood_scale * len(solution)
 
 
     """
@@ -152,28 +463,17 @@ def local_search_heuristic_simplified(sets, solution, amount_elements_covered_di
     if print_logs:
         print("Removing sets from solution randomly...")
 
-    while d <= D:
+    while d <= D and len(solution) > 0:
         # 1. Randomly select a set from solution
-        current_set_index = random.choice(current_solution_list_indices)
+        current_set_index = solution.random_in_solution(rng)
 
         # 2. Move the set from solution to not-covered;
-        not_in_solution.append(current_set_index)
-        current_solution_list_indices.remove(current_set_index)
-
-        for element in set_collection[current_set_index]:
-            amount_elements_covered_dict[element] -= 1
+        remove_set_from_solution(set_collection, current_set_index, solution, amount_elements_covered_dict, undo_log, uncovered_elements)
 
         d += 1
 
-    # Getting a complete indices list of sets, that are currently not in the solution
-    for j in range(0, len(set_collection)):
-        if j in current_solution_list_indices:
-            continue
-        else:
-            not_in_solution.append(j)
-
     if print_logs:
-        print("Sets, that are currently not in solution: ", len(not_in_solution))
+        print("Sets, that are currently not in solution: ", solution.amount_not_in_solution)
 
 
     if print_logs:
@@ -181,68 +481,66 @@ def local_search_heuristic_simplified(sets, solution, amount_elements_covered_di
         print("Checking which sets can be brought into solution \n")
 
     added_to_solution = list()
-    uncovered_elements_existing = True
+    # Each set not in the solution is tried at most once
+    solution.reset_draws()
     # If all elements are still covered, go to step 6, otherwise continue with step 4.
-    while uncovered_elements_existing: # should be True if that dict has entries!
-        # 3. Update the dict: set the elements that are still covered (-> value is higher than 0)
-        uncovered_count = 0
-        for element in amount_elements_covered_dict:
-            if amount_elements_covered_dict[element] == 0:
-                uncovered_count += 1
-
-
-        if uncovered_count == 0:
+    # 3. uncovered_elements holds the elements that are not covered anymore (-> value is 0)
+    while len(uncovered_elements) > allowed_uncovered and (max_sets is None or len(solution) < max_sets):
+        random_set = solution.draw_not_in_solution(rng)
+        if random_set is None:
             break
 
-
-        random_set = random.choice(not_in_solution)
-
         add_random_set_to_solution = False
         for element in set_collection[random_set]:
-            if amount_elements_covered_dict[element] != 0:
-                continue
-            else:
-                amount_elements_covered_dict[element] += 1
+            if element in uncovered_elements:
                 add_random_set_to_solution = True
+                break
 
 
         if add_random_set_to_solution:
-            current_solution_list_indices.append(random_set)
+            add_set_to_solution(set_collection, random_set, solution, amount_elements_covered_dict, undo_log, uncovered_elements)
             added_to_solution.append(random_set)
             #if print_logs:
             #    print("Set added!", "Uncovered Words: ", uncovered_count)
 
-        not_in_solution.remove(random_set)
-        if len(not_in_solution) == 0:
-            break
-
-
-    # 6. Remove all duplicates
-    solution_indices = set(current_solution_list_indices)
 
     if print_logs:
-        print("Added sets: ", len(added_to_solution), "Difference: len(Solution-now) - len(Solution-before)  = ", len(solution_indices)-len(solution))
+        print("Added sets: ", len(added_to_solution), "Difference: len(Solution-now) - len(Solution-before)  = ", len(solution)-solution_size_before)
 
 
-    return solution_indices, amount_elements_covered_dict
+    return solution, amount_elements_covered_dict
 
 
-def local_search_heuristic(sets, solution, amount_elements_covered_dict, neighbourhood_scale=0.001, search_depth=2, print_logs=False):
+def local_search_heuristic(sets, solution, amount_elements_covered_dict, neighbourhood_scale=0.001, search_depth=2, print_logs=False, rng=random, undo_log=None, uncovered_elements=None, inverted_index=None, set_lengths=None, allowed_uncovered=0, max_sets=None):
     """
     This algorithm is the main contribution of:
         Jacobs, L. W., & Brusco, M. J. (1995). Note: A local‐search heuristic for large set‐covering problems.
         Naval Research Logistics (NRL), 42(7), 1129-1140.
 
-    :param sets: collection of len_set_collection subsets / and a copy of it; = sets_universe
+    The move is applied in place: solution and amount_elements_covered_dict are changed.
+    The sets to bring back into the solution are kept in an indexed heap keyed by their cost ratio
+    (set length / amount of uncovered elements the set recovers). When an element gets covered, the keys
+    of the sets containing it are updated through the inverted index, so nothing is recomputed from scratch.
+
+    :param sets: collection of len_set_collection subsets; = sets_universe or its Corpus; only read
 
-    :param solution: a feasible solution to start with
+    :param solution: a feasible solution to start with; SolutionState (changed in place) or set of indices
     :param amount_elements_covered_dict: a dict which saves the numbers, how often each element is covered
 
     :param neighbourhood_scale: percentage of sets in tentative solution to be removed at each iteration; magnitude of neighbourhood-search
     :param search_depth: percentage of set cost(=length) that is accepted for new solution at each iteration; control for search-depth
 
     :param print_logs: prints outputs and parameters of used functions.
-    :return: solution set containing a sub-collection of indices of set_collection
+    :param rng: random number generator, an instance of random.Random or the random module
+    :param undo_log: optional list all changes of the move are recorded in, so it can be rolled back by undo_moves()
+    :param uncovered_elements: optional set of the elements with count 0, kept up to date in place;
+                               computed from amount_elements_covered_dict if not given
+    :param allowed_uncovered: amount of elements the repaired solution may leave uncovered (partial cover)
+    :param max_sets: optional budget of sets; the repair stops when the solution has max_sets sets
+    :param inverted_index: inverted index of sets, see build_inverted_index(); built if not given
+    :param set_lengths: list containing the lengths of all sets, see compute_set_lengths(); computed if not given
+                        (when called repeatedly, pass inverted_index and set_lengths in)
+    :return: the changed solution as SolutionState and the dict
     """
 
     if print_logs:
@@ -256,25 +554,25 @@ def local_search_heuristic(sets, solution, amount_elements_covered_dict, neighbo
     Initialization & Pre-processes
     """
 
-    feasible_solution = solution
-    amount_elements_covered_dict = amount_elements_covered_dict
-
-
-    set_collection = deepcopy(sets)
+    set_collection = sets
+    if not isinstance(solution, SolutionState):
+        solution = SolutionState(len(set_collection), solution)
+    if inverted_index is None:
+        inverted_index = build_inverted_index(set_collection)
+    if set_lengths is None:
+        set_lengths = compute_set_lengths(set_collection)
 
 
     # 0.
     if print_logs:
         print("Initialization.")
 
-    current_solution_list_indices = list(feasible_solution)
+    if uncovered_elements is None:
+        uncovered_elements = get_uncovered_elements(amount_elements_covered_dict)
 
-    set_lengths = compute_set_lengths(get_set_list_of_solution_indices(collection=set_collection, solution_indices=current_solution_list_indices))
     d = 0
-    D = neighbourhood_scale * len(current_solution_list_indices)
-    maximum_set_length_allowed = max(set_lengths) * search_depth
-
-    not_in_solution = list()
+    D = neighbourhood_scale * len(solution)
+    maximum_set_length_allowed = max(set_lengths[set_i] for set_i in solution) * search_depth if len(solution) > 0 else 0
 
 
     """
@@ -285,106 +583,79 @@ def local_search_heuristic(sets, solution, amount_elements_covered_dict, neighbo
         print("Solution optimization by simulated annealing approach")
         print("Removing sets from solution randomly...")
 
-    while d <= D:
+    while d <= D and len(solution) > 0:
         # 1. Randomly select a set from solution
-        current_set_index = random.choice(current_solution_list_indices)
+        current_set_index = solution.random_in_solution(rng)
 
         # 2. Move the set from solution to not-covered;
-        not_in_solution.append(current_set_index)
-        current_solution_list_indices.remove(current_set_index)
-
-        for element in set_collection[current_set_index]:
-            amount_elements_covered_dict[element] -= 1
+        remove_set_from_solution(set_collection, current_set_index, solution, amount_elements_covered_dict, undo_log, uncovered_elements)
 
         d += 1
 
-    # Getting a complete indices list of sets, that are currently not in the solution
-    for j in range(0, len(set_collection)):
-        if j in current_solution_list_indices:
-            continue
-        else:
-            not_in_solution.append(j)
-
     if print_logs:
-        print("Set, that are currently not in solution: ", len(not_in_solution))
+        print("Set, that are currently not in solution: ", solution.amount_not_in_solution)
 
 
     if print_logs:
         print("\nCheck which elements now got uncovered...")
         print("Checking which sets are short enough to be brought into solution again")
         print("and how many elements get 'recovered' by those sets...\n")
-        print("---Amount Elements covered now: ", len(amount_elements_covered_dict), "\n")
-
-
-    added_to_solution = list()
-    uncovered_elements_existing = True
-    # If all elements are still covered, go to step 6, otherwise continue with step 4.
-    while uncovered_elements_existing: # should be True if that dict has entries!
-        # 3. Update the dict: set the elements that are still covered (-> value is higher than 0)
-        uncovered_count = 0
-        for element in amount_elements_covered_dict:
-            if amount_elements_covered_dict[element] == 0:
-                uncovered_count += 1
-
-        #if print_logs:
-        #    print("Uncovered Words: ", uncovered_count)
+        print("---Amount Elements uncovered now: ", len(uncovered_elements), "\n")
 
-        if uncovered_count == 0:
-            break
-
-
-        # 4. Make a dict of sets which have a length that lower-equals maximum_set_length_allowed
-        # and recover enough uncovered elements
-        recovering_dict = defaultdict()
-        for set_i in not_in_solution:
-
-            # Checking set size
-            set_length = len(set_collection[set_i])
-            print(len(not_in_solution))
-            print(maximum_set_length_allowed, "\n")
-            if set_length <= maximum_set_length_allowed:
-
-                # Initialize set value with 0
-                recovering_dict[set_i] = 0
-
-                # Compute how many current-uncovered-elements this set recovers and save it as value in recovering_dict
-                for element in amount_elements_covered_dict:
-                    if amount_elements_covered_dict[element] != 0:
-                        continue
-                    if element in set_collection[set_i]:
-                        recovering_dict[set_i] += 1
 
-                if recovering_dict[set_i] == 0:
-                    del recovering_dict[set_i]
+    # 4. Count for the sets not in solution, which have a length that lower-equals maximum_set_length_allowed,
+    # how many uncovered elements they recover. Only sets containing an uncovered element can recover any.
+    recovering_dict = dict()
+    for element in uncovered_elements:
+        for set_i in inverted_index[element]:
+            if set_i not in solution and set_lengths[set_i] <= maximum_set_length_allowed:
+                recovering_dict[set_i] = recovering_dict.get(set_i, 0) + 1
 
+    # Key: "cost"-value set length / amount recovered elements; taking the amount recovering sets worked best
+    # (the set index breaks ties). With a budget of sets every set costs the same, so the sets recovering
+    # the most elements come first.
+    def recovering_key(set_i):
+        if max_sets is not None:
+            return -recovering_dict[set_i], set_i
+        return set_lengths[set_i] / recovering_dict[set_i], set_i
 
-                else:  # Taking the amount recovering sets worked best
-                    recovering_dict[set_i] = set_length / recovering_dict[set_i]  # Quite slow!
-                    # recovering_dict[set_i] = recovering_dict[set_i] / set_length    # Totally bad!!
+    recovering_heap = IndexedMinHeap()
+    for set_i in recovering_dict:
+        recovering_heap.push(set_i, recovering_key(set_i))
 
+    added_to_solution = list()
+    # If all elements are still covered, go to step 6, otherwise continue with step 4.
+    # 3. uncovered_elements holds the elements that are not covered anymore (-> value is 0)
+    while len(uncovered_elements) > allowed_uncovered and len(recovering_heap) > 0 and \
+            (max_sets is None or len(solution) < max_sets):
 
-        # Select a set where the "cost"-value of the recovering_dict is minimum
-        key_of_cost_min = min(recovering_dict.keys(), key=(lambda k: recovering_dict[k]))
+        # Select a set where the "cost"-value is minimum
+        key_of_cost_min, _ = recovering_heap.pop()
+        recovered_elements = [element for element in set_collection[key_of_cost_min] if element in uncovered_elements]
 
-        current_solution_list_indices.append(key_of_cost_min)
+        add_set_to_solution(set_collection, key_of_cost_min, solution, amount_elements_covered_dict, undo_log, uncovered_elements)
         added_to_solution.append(key_of_cost_min)
-        not_in_solution.remove(key_of_cost_min)
 
-
-        for element in set_collection[key_of_cost_min]:
-            amount_elements_covered_dict[element] += 1
-
-    # 6. Remove all duplicates
-    solution_indices = set(current_solution_list_indices)
+        # The recovered elements are covered now: the other sets containing them recover one element less
+        for element in recovered_elements:
+            for set_i in inverted_index[element]:
+                if set_i not in recovering_heap:
+                    continue
+                recovering_dict[set_i] -= 1
+                if recovering_dict[set_i] == 0:
+                    recovering_heap.remove(set_i)
+                else:
+                    recovering_heap.update(set_i, recovering_key(set_i))
 
     if print_logs:
         print("Added sets: ", added_to_solution)
 
 
-    return solution_indices, amount_elements_covered_dict
+    return solution, amount_elements_covered_dict
 
 
 if __name__ == "__main__":
+    wds_universe, sets_universe = load_dataset("reuters")
     print("")
 
     """
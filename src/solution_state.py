@@ -0,0 +1,135 @@
+import random
+
+
+class SolutionState(object):
+    """
+    Membership of the sets of a collection in a solution, with O(1) membership test, O(1) add/remove and
+    O(1) uniform sampling of sets in and not in the solution, independent of the size of the collection.
+
+    All set indices 0..amount_sets-1 are kept in one permutation, order, with position[i] being the index
+    of set i in order. The first size entries of order are the sets in the solution, the others are not:
+
+        order = [ in solution | not in solution ]
+                  0 .. size-1   size .. amount_sets-1
+
+    A set is added or removed by swapping it with the first set outside / the last set inside the solution.
+
+    In addition, sets not in the solution can be drawn without replacement by draw_not_in_solution(); the
+    drawn ones are kept right behind the solution:
+
+        order = [ in solution | drawn | not drawn ]
+
+    Example:
+
+    state = SolutionState(5, {1, 3})
+    state.order = [1, 3, 2, 0, 4], state.position = [3, 0, 2, 1, 4], state.size = 2
+
+    """
+
+    def __init__(self, amount_sets, solution=()):
+        """
+        :param amount_sets: number of sets in the collection
+        :param solution: iterable of indices of the sets in the solution
+        """
+        self.order = list(range(amount_sets))
+        self.position = list(range(amount_sets))
+        self.size = 0
+        self.drawn = 0
+        for set_i in solution:
+            self.add(set_i)
+
+    def __contains__(self, set_i):
+        return self.position[set_i] < self.size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.order[:self.size])
+
+    @property
+    def amount_not_in_solution(self):
+        return len(self.order) - self.size
+
+    def _swap(self, i, j):
+        # Swap the sets at the positions i and j of order
+        order = self.order
+        order[i], order[j] = order[j], order[i]
+        self.position[order[i]] = i
+        self.position[order[j]] = j
+
+    def add(self, set_i):
+        """
+        Add a set to the solution; nothing happens if it is already part of it.
+        """
+        position = self.position[set_i]
+        if position < self.size:
+            return
+        if position < self.size + self.drawn:
+            # A drawn set leaves the drawn ones; the first drawn set takes its place
+            self.drawn -= 1
+        elif self.drawn > 0:
+            # Move it to the first not drawn position first; the first drawn set takes that place
+            self._swap(position, self.size + self.drawn)
+            position = self.size + self.drawn
+        self._swap(position, self.size)
+        self.size += 1
+
+    def remove(self, set_i):
+        """
+        Remove a set from the solution.
+        :raise KeyError: if the set is not part of the solution
+        """
+        position = self.position[set_i]
+        if position >= self.size:
+            raise KeyError(set_i)
+        self.size -= 1
+        self._swap(position, self.size)
+        if self.drawn > 0:
+            # Keep the drawn sets right behind the solution; the removed set counts as not drawn
+            self._swap(self.size, self.size + self.drawn)
+
+    def random_in_solution(self, rng=random):
+        """
+        :param rng: random number generator, an instance of random.Random or the random module
+        :return: a uniformly chosen set of the solution
+        """
+        return self.order[rng.randrange(self.size)]
+
+    def random_not_in_solution(self, rng=random):
+        """
+        :param rng: random number generator, an instance of random.Random or the random module
+        :return: a uniformly chosen set not in the solution
+        """
+        return self.order[self.size + rng.randrange(len(self.order) - self.size)]
+
+    def draw_not_in_solution(self, rng=random):
+        """
+        Draw a set not in the solution without replacement, see also reset_draws().
+        :param rng: random number generator, an instance of random.Random or the random module
+        :return: a uniformly chosen set not in the solution that was not drawn before; None if all were drawn
+        """
+        first_not_drawn = self.size + self.drawn
+        if first_not_drawn >= len(self.order):
+            return None
+        self._swap(first_not_drawn, first_not_drawn + rng.randrange(len(self.order) - first_not_drawn))
+        self.drawn += 1
+        return self.order[first_not_drawn]
+
+    def reset_draws(self):
+        """
+        Make all sets not in the solution available to draw_not_in_solution() again.
+        """
+        self.drawn = 0
+
+    def not_in_solution(self):
+        """
+        :return: list of the sets not in the solution
+        """
+        return self.order[self.size:]
+
+    def to_set(self):
+        """
+        :return: the solution as set of indices
+        """
+        return set(self.order[:self.size])
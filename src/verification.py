@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+import numpy as np
+
+from src.corpus import Corpus
+
+# Result of verify_solutions() for one solution:
+#   amount_sets         amount of sets in the solution
+#   covered_elements    amount of elements covered by the solution
+#   elements_to_cover   amount of elements that need to be covered
+#   coverage_rate       covered elements of those to cover / elements to cover
+#   redundant_sets      amount of sets whose elements are all covered at least twice, see remove_redundant_sets()
+#   sum_of_set_sizes    sum of the sizes of all sets in the solution
+#   multiplicity        int64 array; how often each element (by ID) is covered
+SolutionReport = namedtuple("SolutionReport", ["amount_sets", "covered_elements", "elements_to_cover", "coverage_rate",
+                                               "redundant_sets", "sum_of_set_sizes", "multiplicity"])
+
+
+def gather_elements(corpus, set_indices):
+    """
+    Gather the element IDs of several sets of a corpus with one fancy-indexing step over the CSR arrays.
+    :param corpus: the Corpus
+    :param set_indices: int array of set indices
+    :return: int32 array of the element IDs of all given sets one after another and int64 array of the set lengths
+    """
+    starts = corpus.offsets[set_indices]
+    lengths = corpus.offsets[set_indices + 1] - starts
+    # Position of every gathered element in corpus.elements: start of its set + position within the set
+    segment_starts = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum(), dtype=np.int64) + np.repeat(starts - segment_starts, lengths)
+    return corpus.elements[positions], lengths
+
+
+def verify_solutions(corpus, solutions, elements=None, batch_size=64):
+    """
+    Verify a batch of solutions at once on the CSR arrays of a corpus.
+
+    The element IDs of all sets of a batch of solutions are gathered into one array; np.bincount over
+    (solution number * universe size + element ID) gives the multiplicity of every element in every solution.
+    The redundant sets are the sets without an element of multiplicity 1.
+
+    :param corpus: the Corpus the solutions refer to
+    :param solutions: list of solutions, each an iterable of set indices
+    :param elements: IDs of the elements that need to be covered; all IDs of the corpus if None
+    :param batch_size: number of solutions counted in one np.bincount; bounds the memory to
+                       batch_size * universe size counters
+    :return: list of SolutionReport, in the order of solutions
+    """
+    universe_size = corpus.universe_size
+    if elements is None:
+        to_cover = None
+        elements_to_cover = universe_size
+    else:
+        to_cover = np.zeros(universe_size, dtype=bool)
+        to_cover[np.fromiter(elements, dtype=np.int64, count=len(elements))] = True
+        elements_to_cover = len(elements)
+
+    reports = list()
+    for batch_start in range(0, len(solutions), batch_size):
+        batch = [np.fromiter(solution, dtype=np.int64) for solution in solutions[batch_start:batch_start + batch_size]]
+        set_indices = np.concatenate(batch) if batch else np.zeros(0, dtype=np.int64)
+        gathered, lengths = gather_elements(corpus, set_indices)
+
+        # Number of the solution within the batch, for every set and every gathered element
+        set_solution = np.repeat(np.arange(len(batch)), [len(solution) for solution in batch])
+        element_solution = np.repeat(set_solution, lengths)
+
+        multiplicities = np.bincount(element_solution * universe_size + gathered,
+                                     minlength=len(batch) * universe_size).reshape(len(batch), universe_size)
+
+        # Sets which have an element of multiplicity 1 are needed; the others are redundant
+        single = multiplicities[element_solution, gathered] == 1
+        set_numbers = np.repeat(np.arange(len(set_indices)), lengths)
+        needed = np.bincount(set_numbers[single], minlength=len(set_indices)) > 0
+        redundant_sets = np.bincount(set_solution[~needed], minlength=len(batch))
+        sum_of_set_sizes = np.bincount(set_solution, weights=lengths, minlength=len(batch))
+
+        for b in range(len(batch)):
+            multiplicity = multiplicities[b]
+            if to_cover is None:
+                covered_elements = int(np.count_nonzero(multiplicity))
+            else:
+                covered_elements = int(np.count_nonzero(multiplicity[to_cover]))
+            reports.append(SolutionReport(len(batch[b]), covered_elements, elements_to_cover,
+                                          covered_elements / elements_to_cover if elements_to_cover else 1.0,
+                                          int(redundant_sets[b]), int(sum_of_set_sizes[b]), multiplicity))
+    return reports
+
+
+def verify_solution(collection, solution_indices, elements=None, print_logs=False):
+    """
+    Verify a single solution, see verify_solutions().
+    :param collection: the Corpus, or a collection of sets of words (e.g. sets_universe); the sets of the
+                       solution are interned then, together with elements
+    :param solution_indices: iterable containing indices of sets of collection
+    :param elements: elements that need to be covered (IDs for a Corpus, words otherwise); if None, all elements
+                     of the collection (for a collection of sets of words they are collected from all its sets,
+                     so pass them in when verifying repeatedly)
+    :param print_logs: prints outputs and parameters of used functions.
+    :return: SolutionReport
+    """
+    if isinstance(collection, Corpus):
+        return verify_solutions(collection, [solution_indices], elements)[0]
+
+    if elements is None:
+        elements = set()
+        for set_i in collection:
+            elements.update(set_i)
+
+    solution_indices = list(solution_indices)
+    # The elements get the IDs 0..len(elements)-1, see Corpus.from_sets()
+    corpus = Corpus.from_sets([collection[i] for i in solution_indices], elements, print_logs=print_logs)
+    return verify_solutions(corpus, [range(len(solution_indices))], range(len(elements)))[0]
@@ -4,8 +4,11 @@ import time
 from src.disk_friendly_greedy import *
 from src.simulated_annealing import *
 from src.greedy import *
+from src.lazy_greedy import *
+from src.bucket_greedy import *
 from src.preprocesses import *
-from text_coverage_data import sets_universe, wds_universe
+from src.verification import verify_solution, verify_solutions
+from text_coverage_data import load_dataset
 import numpy as np
 import pickle
 
@@ -16,23 +19,19 @@ def percentage_of_solution_covering(elements, collection, solution_indices):
     """
     Method for verifying whether a solution-index-set contains the same elements
     as the reference elements list or not and therefore represents an optimal solution.
-    :param elements: elements that need to be covered
-    :param collection: collection of sets for covering
+    :param elements: elements that need to be covered (IDs if collection is a Corpus)
+    :param collection: collection of sets for covering; a Corpus is verified fastest
     :param solution_indices: containing indices of sets covered from collection
-    :return: amount of solution elements, amount elements to cover and
+    :return: amount of covered elements, amount elements to cover and
              percentage value how many elements are covered by the solution elements
     """
-    solution_elements = set()
-    for i in solution_indices:
-        for j in collection[i]:
-            solution_elements.add(j)
-    percentage_overlapping = len(solution_elements) / len(elements)
-
-    return len(solution_elements), len(elements), percentage_overlapping
+    report = verify_solution(collection, solution_indices, elements)
+    return report.covered_elements, report.elements_to_cover, report.coverage_rate
 
 
 def testing_on_example_data():
     global solution_indices
+    wds_universe, sets_universe = load_dataset("reuters")
     # Test set containing only a partition of sets_universe:
     test_sets_1 = [sets_universe[0],
                    sets_universe[1],
@@ -77,6 +76,9 @@ def testing_on_example_data():
 
 if __name__ == "__main__":
     print("")
+    wds_universe, sets_universe = load_dataset("reuters")
+    # Same sets in the same order, interned; used for verifying the solutions
+    wds_ids, corpus = load_dataset("reuters", interned=True)
     # testing_on_example_data()
     # print("wds: ", wds_universe.__class__)
     # print("sets: ", sets_universe.__class__)
@@ -100,6 +102,9 @@ if __name__ == "__main__":
         if os.stat(file).st_size == 0:
             f.write(headline)
 
+        p_values = list()
+        solutions = list()
+        execution_times = list()
         for p in np.arange(1.005, 2.000, 0.005):
             start = time.time()
             solution_indices = disk_friendly_greedy(sets=sets_universe,
@@ -107,15 +112,15 @@ if __name__ == "__main__":
                                                     print_logs=False)
             end = time.time()
 
-            execution_time = round(end - start, ndigits=3)
-            solution_indices_len = len(solution_indices)
-            solution_len, elements_len, percentage = percentage_of_solution_covering(wds_universe, sets_universe,
-                                                                                     solution_indices)
-            solution_sets = get_set_list_of_solution_indices(sets_universe, solution_indices)
-            solution_sets_sizes = get_sum_of_all_set_sizes_of_solution_indices(sets_universe, solution_indices)
+            p_values.append(round(p, ndigits=4))
+            solutions.append(solution_indices)
+            execution_times.append(round(end - start, ndigits=3))
 
-            values = str(round(p, ndigits=4)) + "," + str(solution_indices_len) + "," + str(solution_len) + "," + str(
-                elements_len) + "," + str(percentage) + "," + str(solution_sets_sizes) + "," + str(execution_time) + "\n"
+        # Verifying all solutions of the sweep at once
+        reports = verify_solutions(corpus, solutions)
+        for p, report, execution_time in zip(p_values, reports, execution_times):
+            values = str(p) + "," + str(report.amount_sets) + "," + str(report.covered_elements) + "," + str(
+                report.elements_to_cover) + "," + str(report.coverage_rate) + "," + str(report.sum_of_set_sizes) + "," + str(execution_time) + "\n"
             print(headline)
             print(values)
             f.write(values)
@@ -140,16 +145,42 @@ if __name__ == "__main__":
 
             execution_time = round(end - start, ndigits=3)
             solution_indices_len = len(solution_indices)
-            solution_len, elements_len, percentage = percentage_of_solution_covering(wds_universe, sets_universe,
-                                                                                     solution_indices)
-            solution_sets = get_set_list_of_solution_indices(sets_universe, solution_indices)
-            solution_sets_sizes = get_sum_of_all_set_sizes_of_solution_indices(sets_universe, solution_indices)
+            report = verify_solution(corpus, solution_indices)
+            solution_len, elements_len, percentage = report.covered_elements, report.elements_to_cover, report.coverage_rate
+            solution_sets_sizes = report.sum_of_set_sizes
+
+            print(headline)
+            values = str(solution_indices_len) + "," + str(solution_len) + "," + str(elements_len) + "," + str(
+                percentage) + "," + str(solution_sets_sizes) + "," + str(execution_time) + "\n"
+            print(values)
+            f.write(values)
+
+    # Testing the exact greedy engines; reference for the disk-friendly greedy results
+    if False:
+        headline = "Amount of sets in solution,Covered Elements,Elements to be covered,Coverage Rate,Sum of all Set-sizes in solution,Time elapsed in sec\n"
+
+        for name, exact_greedy in (("lazy_greedy", lazy_greedy), ("bucket_greedy", bucket_greedy)):
+            file = "out/" + name + "_results.csv"
+            f = open(file, "a")
+            if os.stat(file).st_size == 0:
+                f.write(headline)
+
+            start = time.time()
+            solution_indices = exact_greedy(sets=sets_universe, print_logs=True)
+            end = time.time()
+
+            execution_time = round(end - start, ndigits=3)
+            solution_indices_len = len(solution_indices)
+            report = verify_solution(corpus, solution_indices)
+            solution_len, elements_len, percentage = report.covered_elements, report.elements_to_cover, report.coverage_rate
+            solution_sets_sizes = report.sum_of_set_sizes
 
             print(headline)
             values = str(solution_indices_len) + "," + str(solution_len) + "," + str(elements_len) + "," + str(
                 percentage) + "," + str(solution_sets_sizes) + "," + str(execution_time) + "\n"
             print(values)
             f.write(values)
+            f.close()
 
     # Saving a greedy solution as pickle file (good for testing simulated annealing)
     if False:
@@ -191,8 +222,7 @@ if __name__ == "__main__":
                 execution_time = round(end - start, ndigits=3)
 
                 solution_indices_len = len(solution_indices)
-                solution_len, elements_len, percentage = percentage_of_solution_covering(wds_universe, sets_universe,
-                                                                                         solution_indices)
+                solution_len, elements_len, percentage = percentage_of_solution_covering(wds_ids, corpus, solution_indices)
 
                 print(headline)
                 values = str(solution_indices_len) + "," + str(iterations) + "," + str(solution_len) + "," + str(elements_len) + "," + str(
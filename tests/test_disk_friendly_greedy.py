@@ -0,0 +1,62 @@
+import random
+
+from src.corpus import Corpus
+from src.disk_friendly_greedy import disk_friendly_greedy, disk_friendly_greedy_out_of_core, write_collection_file
+
+
+def random_instances(amount, seed=0):
+    """
+    :return: generator of random collections of sets of int elements, with empty and duplicate sets
+    """
+    rng = random.Random(seed)
+    for _ in range(amount):
+        universe = list(range(rng.randint(1, 60)))
+        sets = [set(rng.sample(universe, rng.randint(0, min(len(universe), 20)))) for _ in range(rng.randint(1, 40))]
+        if rng.random() < 0.5:
+            sets.append(set(rng.choice(sets)))
+        yield sets
+
+
+def covers(sets, solution_indices):
+    return set().union(*(sets[i] for i in solution_indices)) == set().union(*sets)
+
+
+def test_all_variants_return_the_same_cover(tmp_path):
+    """
+    The in-core greedy on sets, on a Corpus and with bitsets and the out-of-core greedy select the same sets,
+    and these sets cover every element.
+    """
+    collection_path = str(tmp_path / "collection.bin")
+    for instance, sets in enumerate(random_instances(80)):
+        corpus = Corpus.from_sets(sets, print_logs=False)
+        write_collection_file(corpus, collection_path)
+        for p in (1.1, 2, 3.5):
+            solution = disk_friendly_greedy(sets, p)
+            assert covers(sets, solution), (instance, p)
+            assert disk_friendly_greedy(corpus, p) == solution, (instance, p)
+            assert disk_friendly_greedy(corpus, p, use_bitsets=True) == solution, (instance, p)
+            assert disk_friendly_greedy_out_of_core(collection_path, p, corpus.universe_size,
+                                                    spill_dir=str(tmp_path / "spill")) == solution, (instance, p)
+
+
+def test_partial_cover_limits(tmp_path):
+    """
+    With target_coverage or max_sets all variants stop at the same point and respect the limit.
+    """
+    collection_path = str(tmp_path / "collection.bin")
+    for instance, sets in enumerate(random_instances(40, seed=1)):
+        corpus = Corpus.from_sets(sets, print_logs=False)
+        write_collection_file(corpus, collection_path)
+        amount_elements = len(set().union(*sets))
+        for target_coverage, max_sets in ((0.7, None), (1.0, 3)):
+            solution = disk_friendly_greedy(sets, 2, target_coverage=target_coverage, max_sets=max_sets)
+            covered = set().union(*(sets[i] for i in solution))
+            if max_sets is None:
+                assert len(covered) >= target_coverage * amount_elements, instance
+            else:
+                assert len(solution) <= max_sets, instance
+            assert disk_friendly_greedy(corpus, 2, use_bitsets=True, target_coverage=target_coverage,
+                                        max_sets=max_sets) == solution, instance
+            assert disk_friendly_greedy_out_of_core(collection_path, 2, corpus.universe_size,
+                                                    target_coverage=target_coverage,
+                                                    max_sets=max_sets) == solution, instance
@@ -0,0 +1,63 @@
+import heapq
+import random
+
+import pytest
+
+from src.indexed_heap import IndexedMinHeap
+
+
+def test_example():
+    heap = IndexedMinHeap()
+    heap.push('A', 3.0)
+    heap.push('B', 1.5)
+    heap.update('A', 0.5)
+    assert heap.pop() == ('A', 0.5)
+    assert heap.pop() == ('B', 1.5)
+    with pytest.raises(IndexError):
+        heap.pop()
+
+
+def test_matches_heapq():
+    """
+    Random push, update, remove and pop operations, compared with a heapq of (key, item) entries whose
+    outdated entries are skipped when they come up.
+    """
+    rng = random.Random(0)
+    for _ in range(200):
+        heap = IndexedMinHeap()
+        reference = list()
+        keys = dict()
+
+        def pop_reference():
+            while True:
+                key, item = heapq.heappop(reference)
+                if keys.get(item) == key:
+                    del keys[item]
+                    return item, key
+
+        for _ in range(200):
+            operation = rng.random()
+            item = rng.randrange(30)
+            if operation < 0.4:
+                key = rng.random()
+                heap.push(item, key)
+                keys[item] = key
+                heapq.heappush(reference, (key, item))
+            elif operation < 0.6 and item in keys:
+                key = rng.random()
+                heap.update(item, key)
+                keys[item] = key
+                heapq.heappush(reference, (key, item))
+            elif operation < 0.75 and item in keys:
+                heap.remove(item)
+                del keys[item]
+            elif operation < 0.9 and keys:
+                item, key = heap.peek()
+                assert heap.pop() == (item, key) == pop_reference()
+
+            assert len(heap) == len(keys)
+            assert all(item in heap and heap.key(item) == key for item, key in keys.items())
+
+        while keys:
+            assert heap.pop() == pop_reference()
+        assert len(heap) == 0
@@ -0,0 +1,80 @@
+import itertools
+import random
+
+from src.corpus import Corpus
+from src.lazy_greedy import lazy_greedy
+from src.preprocesses import kernelize, map_solution_to_original, remove_duplicate_and_dominated_sets
+
+
+def random_instances(amount, seed=0):
+    """
+    :return: generator of small random instances (list of sets, elements), small enough for brute force
+    """
+    rng = random.Random(seed)
+    for _ in range(amount):
+        universe = list(range(rng.randint(1, 9)))
+        sets = [set(rng.sample(universe, rng.randint(0, len(universe)))) for _ in range(rng.randint(1, 8))]
+        yield sets, set().union(*sets)
+
+
+def optimal_cover_size(sets, elements):
+    """
+    :return: the size of a minimum set cover of elements, found by trying all sub-collections by size
+    """
+    for size in range(len(sets) + 1):
+        for combination in itertools.combinations(range(len(sets)), size):
+            if elements <= set().union(*(sets[i] for i in combination)):
+                return size
+
+
+def covers(sets, solution_indices, elements):
+    return elements <= set().union(*(sets[i] for i in solution_indices))
+
+
+def test_kernelize_example():
+    core, core_elements, comparison_list, fixed_solution = kernelize([{'A', 'B'}, {'B', 'C'}, {'C', 'D'}, {'D'}])
+    assert core == [] and core_elements == set() and comparison_list == [] and fixed_solution == {0, 2}
+
+
+def test_kernelize_keeps_optimum():
+    for sets, elements in random_instances(300):
+        core, core_elements, comparison_list, fixed_solution = kernelize(sets)
+        assert optimal_cover_size(sets, elements) == len(fixed_solution) + optimal_cover_size(core, core_elements)
+
+        solution = fixed_solution | map_solution_to_original(lazy_greedy(core), comparison_list)
+        assert covers(sets, solution, elements)
+
+
+def test_kernelize_corpus_matches_sets():
+    for sets, elements in random_instances(50, seed=1):
+        corpus = Corpus.from_sets(sets, print_logs=False)
+        core, core_elements, comparison_list, fixed_solution = kernelize(sets)
+        corpus_core, corpus_elements, corpus_list, corpus_fixed = kernelize(corpus)
+        assert corpus_list == comparison_list and corpus_fixed == fixed_solution
+        assert [corpus.decode(corpus_core[i]) for i in range(len(corpus_core))] == core
+        assert corpus.decode(corpus_elements) == core_elements
+
+
+def test_remove_duplicate_and_dominated_sets_example():
+    reduced, comparison_list = remove_duplicate_and_dominated_sets([{'A', 'B'}, {'B'}, {'A', 'B'}, {'C'}, set()])
+    assert reduced == [{'A', 'B'}, {'C'}] and comparison_list == [0, 3]
+
+
+def test_remove_duplicate_and_dominated_sets_keeps_optimum():
+    for sets, elements in random_instances(300, seed=2):
+        reduced, comparison_list = remove_duplicate_and_dominated_sets(sets)
+        assert len(set(map(frozenset, reduced))) == len(reduced)
+        assert not any(reduced[i] < reduced[j] for i in range(len(reduced)) for j in range(len(reduced)))
+        assert optimal_cover_size(sets, elements) == optimal_cover_size(reduced, elements)
+
+        solution = map_solution_to_original(lazy_greedy(reduced), comparison_list)
+        assert covers(sets, solution, elements)
+
+
+def test_remove_duplicate_and_dominated_sets_corpus_matches_sets():
+    for sets, elements in random_instances(50, seed=3):
+        corpus = Corpus.from_sets(sets, print_logs=False)
+        reduced, comparison_list = remove_duplicate_and_dominated_sets(sets)
+        corpus_reduced, corpus_list = remove_duplicate_and_dominated_sets(corpus)
+        assert corpus_list == comparison_list
+        assert [corpus.decode(corpus_reduced[i]) for i in range(len(corpus_reduced))] == reduced
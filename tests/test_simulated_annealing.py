@@ -0,0 +1,50 @@
+import itertools
+import random
+import shutil
+
+import pytest
+
+from src.preprocesses import count_element_coverage
+from src.simulated_annealing import iter_simulated_annealing, load_checkpoint
+
+
+def random_instance(seed=0, amount_sets=150, amount_elements=100):
+    rng = random.Random(seed)
+    return [set(rng.sample(range(amount_elements), rng.randint(3, 15))) for _ in range(amount_sets)]
+
+
+@pytest.mark.parametrize("full_local_search", [False, True])
+def test_resume_equals_uninterrupted_run(tmp_path, full_local_search):
+    """
+    A run resumed from a checkpoint finds the same sequence of best solutions as the run which wrote it.
+    Starting from all sets, there are plenty of improvements to compare.
+    """
+    sets = random_instance()
+    solution = set(range(len(sets)))
+    amount_elements_covered_dict = count_element_coverage(sets, solution)
+    checkpoint_path = str(tmp_path / "checkpoint.p")
+    resume_path = str(tmp_path / "resume.p")
+
+    # Checkpoints are written before every move; while the run is paused at a new best solution,
+    # the checkpoint holds the state right before the move which found it
+    run = iter_simulated_annealing(sets, solution, amount_elements_covered_dict, 60, neighbourhood_scale=0.05,
+                                   full_local_search=full_local_search, seed=7,
+                                   checkpoint_path=checkpoint_path, checkpoint_interval=0, print_header=False)
+    for progress in run:
+        if progress.iterations >= 5:
+            break
+    shutil.copy(checkpoint_path, resume_path)
+    assert load_checkpoint(resume_path, len(sets))["iterations"] == progress.iterations - 1
+    uninterrupted = [progress[1:] for progress in itertools.islice(run, 10)]
+    run.close()
+
+    # The seed of the resumed run is overridden by the random state of the checkpoint
+    resumed_run = iter_simulated_annealing(sets, None, None, 60, neighbourhood_scale=0.05,
+                                           full_local_search=full_local_search, seed=123,
+                                           resume_from=resume_path, print_header=False)
+    next(resumed_run)
+    assert next(resumed_run)[1:] == progress[1:]
+    resumed = [progress[1:] for progress in itertools.islice(resumed_run, 10)]
+    resumed_run.close()
+
+    assert len(uninterrupted) == 10 and resumed == uninterrupted
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from src.solution_state import SolutionState
+
+
+def check_invariants(state, solution, drawn):
+    """
+    order is a permutation with position as its inverse; the solution comes first, the drawn sets right behind.
+    """
+    amount_sets = len(state.order)
+    assert sorted(state.order) == list(range(amount_sets))
+    assert all(state.position[set_i] == i for i, set_i in enumerate(state.order))
+    assert len(state) == len(solution) and state.to_set() == solution
+    assert all((set_i in state) == (set_i in solution) for set_i in range(amount_sets))
+    assert set(state.order[state.size:state.size + state.drawn]) == drawn
+    assert set(state.not_in_solution()) == set(range(amount_sets)) - solution
+
+
+def test_example():
+    state = SolutionState(5, [1, 3])
+    assert state.order == [1, 3, 2, 0, 4] and state.position == [3, 0, 2, 1, 4] and state.size == 2
+
+
+def test_remove_missing_set():
+    state = SolutionState(3, {0})
+    with pytest.raises(KeyError):
+        state.remove(1)
+
+
+def test_random_operations():
+    rng = random.Random(0)
+    for _ in range(100):
+        amount_sets = rng.randint(1, 20)
+        solution = set(rng.sample(range(amount_sets), rng.randint(0, amount_sets)))
+        state = SolutionState(amount_sets, solution)
+        drawn = set()
+        check_invariants(state, solution, drawn)
+
+        for _ in range(200):
+            operation = rng.random()
+            set_i = rng.randrange(amount_sets)
+            if operation < 0.3:
+                state.add(set_i)
+                solution.add(set_i)
+                drawn.discard(set_i)
+            elif operation < 0.6 and set_i in solution:
+                state.remove(set_i)
+                solution.discard(set_i)
+            elif operation < 0.9:
+                drawn_set = state.draw_not_in_solution(rng)
+                if drawn_set is None:
+                    assert drawn == set(range(amount_sets)) - solution
+                else:
+                    assert drawn_set not in solution and drawn_set not in drawn
+                    drawn.add(drawn_set)
+            else:
+                state.reset_draws()
+                drawn = set()
+            check_invariants(state, solution, drawn)
+
+            if solution:
+                assert state.random_in_solution(rng) in solution
+            if len(solution) < amount_sets:
+                assert state.random_not_in_solution(rng) not in solution
@@ -9,21 +9,43 @@ This script will create the two variables to be used for the coverage problem.
     The sets are contained in the sets_universe list variable.
 
 
+Nothing is built on import. Use load_dataset() to get the universe/collection pair; it builds
+or fetches the data on first use and keeps it for later calls in the same process:
+
+    wds_universe, sets_universe = load_dataset("reuters")
+    universe_ids, corpus = load_dataset("reuters", interned=True)
+
+For compatibility, "from text_coverage_data import sets_universe, wds_universe" still works
+and loads the reuters sentences lazily.
+
 Running this script should generate the required data. It is recommended to use
 the nltk.download() method to retrieve the data in order to automatically 
 generate the file paths required to run the respective nltk methods.
 
 This script requires the NLP package nltk is downloaded.
 
+The preprocessed corpus is cached in binary form (see src/corpus.py) under CACHE_DIR, which
+defaults to ./cache and can be changed with the environment variable COVERAGE_CACHE_DIR.
+The cache is keyed on the corpus, the granularity of the sets, the source code of the
+cleaning rules below and a fingerprint of the source files (see source_fingerprint()), so it
+is only rebuilt when one of them changes. Bump CACHE_VERSION to invalidate all existing
+caches by hand.
+
 """
-import nltk
+import functools
+import hashlib
+import inspect
+import os
+
+from src.corpus import Corpus, load_corpus, save_corpus
 
 # nltk.download()
 # Using the pop-up window, download the 
 # "reuters" corpus in the corpora tab if not already installed
 
-
-from nltk.corpus import reuters
+CACHE_VERSION = 1
+CACHE_DIR = os.environ.get("COVERAGE_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
 
 
 def set_processing(list_set):
@@ -52,19 +74,155 @@ def sentence_processing(sentences):
     return all_sets
 
 
-# PART 1
-# Creating a set of all words representing my universe
-wds = set(reuters.words())
-list_set = list(wds)
-
-# wds_universe represents all elements that can be "covered"
-wds_universe = set_processing(list_set)
-
-# PART 2
-# Creating the "sets" from sentences
-sentences = reuters.sents()
-# paragraphs=reuters.paras()
-
-# Which ever of the above two variables (sentences or paragraphs) I pass to the
-# sentenceProcessing function becomes my sets to choose.
-sets_universe = sentence_processing(sentences)
+def source_fingerprint(corpus_reader):
+    """
+    Cheap fingerprint of the files of an nltk corpus: the path, size and modification time of each file,
+    without reading them. It changes when the corpus is re-downloaded, replaced or found under another
+    NLTK_DATA path.
+    :param corpus_reader: nltk corpus reader, e.g. nltk.corpus.reuters
+    :return: hex digest
+    """
+    fingerprint = hashlib.sha256()
+    for fileid in corpus_reader.fileids():
+        pointer = corpus_reader.abspath(fileid)
+        if hasattr(pointer, "zipfile"):
+            # The corpus is read from a zip archive; its directory has the size and date of each file
+            info = pointer.zipfile.getinfo(pointer.entry)
+            size, modified = info.file_size, info.date_time
+        else:
+            stat = os.stat(pointer.path)
+            size, modified = stat.st_size, stat.st_mtime_ns
+        fingerprint.update((str(pointer) + "\0" + str(size) + "\0" + str(modified) + "\0").encode("utf-8"))
+    return fingerprint.hexdigest()
+
+
+def cache_key(corpus_name, granularity, fingerprint=""):
+    """
+    :param corpus_name: name of the nltk corpus, e.g. "reuters"
+    :param granularity: what becomes a set; "sentences" or "paragraphs"
+    :param fingerprint: fingerprint of the source files, see source_fingerprint()
+    :return: hex digest identifying the preprocessed data of these inputs and the current cleaning rules
+    """
+    key = hashlib.sha256()
+    for part in (str(CACHE_VERSION), corpus_name, granularity, fingerprint):
+        key.update(part.encode("utf-8") + b"\0")
+    for rule in (set_processing, punctuation_check, sentence_processing):
+        key.update(inspect.getsource(rule).encode("utf-8"))
+    return key.hexdigest()
+
+
+def build_reuters_corpus(granularity="sentences"):
+    """
+    Tokenize and clean the nltk reuters corpus.
+    :param granularity: "sentences" or "paragraphs"; which of them become the sets to choose
+    :return: the Corpus; its vocabulary is the universe of words
+    """
+    from nltk.corpus import reuters
+
+    print("Building the reuters data from nltk...")
+
+    # PART 1
+    # Creating a set of all words representing my universe
+    wds = set(reuters.words())
+    list_set = list(wds)
+
+    # wds_universe represents all elements that can be "covered"
+    wds_universe = set_processing(list_set)
+
+    # PART 2
+    # Creating the "sets" from sentences
+    if granularity == "sentences":
+        sentences = reuters.sents()
+    elif granularity == "paragraphs":
+        # A paragraph is a list of sentences
+        sentences = [[word for sentence in paragraph for word in sentence] for paragraph in reuters.paras()]
+    else:
+        raise ValueError("Unknown granularity: " + str(granularity))
+
+    # Which ever of the above two variables (sentences or paragraphs) I pass to the
+    # sentenceProcessing function becomes my sets to choose.
+    sets_universe = sentence_processing(sentences)
+
+    return Corpus.from_sets(sets_universe, universe=wds_universe)
+
+
+def load_reuters_corpus(granularity="sentences", rebuild=False):
+    """
+    Load the preprocessed reuters corpus from the cache (memory mapped) or build and cache it.
+    :param granularity: "sentences" or "paragraphs"
+    :param rebuild: if set true, the cache is ignored and overwritten
+    :return: the Corpus
+    """
+    from nltk.corpus import reuters
+
+    key = cache_key("reuters", granularity, source_fingerprint(reuters))
+    directory = os.path.join(CACHE_DIR, "reuters-" + granularity + "-" + key[:16])
+
+    if not rebuild:
+        corpus, meta = load_corpus(directory)
+        if corpus is not None and meta.get("key") == key:
+            return corpus
+
+    corpus = build_reuters_corpus(granularity)
+    save_corpus(corpus, directory, meta={"key": key, "corpus": "reuters", "granularity": granularity})
+    return corpus
+
+
+# Loaders of the known datasets; each takes the granularity and returns a Corpus
+DATASETS = {
+    "reuters": load_reuters_corpus,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_corpus(name="reuters", granularity="sentences"):
+    """
+    Build or fetch a dataset on first use; later calls return the same (read-only) Corpus.
+    :param name: name of the dataset, see DATASETS
+    :param granularity: "sentences" or "paragraphs"
+    :return: the Corpus
+    """
+    try:
+        loader = DATASETS[name]
+    except KeyError:
+        raise ValueError("Unknown dataset: " + str(name))
+    return loader(granularity)
+
+
+@functools.lru_cache(maxsize=None)
+def load_dataset(name="reuters", granularity="sentences", interned=False):
+    """
+    Build or fetch a dataset on first use and return its universe/collection pair.
+    Later calls return the same objects, so they must not be modified.
+    :param name: name of the dataset, see DATASETS
+    :param granularity: "sentences" or "paragraphs"
+    :param interned: if set true, the pair is (set of word IDs, Corpus) instead of
+                     (wds_universe, sets_universe) with words as strings
+    :return: the elements to cover and the collection of sets
+    """
+    corpus = get_corpus(name, granularity)
+    if interned:
+        return corpus.universe(), corpus
+
+    # wds_universe represents all elements that can be "covered"
+    wds_universe = set(corpus.vocabulary)
+    # The sets to choose, as sets of words
+    sets_universe = corpus.to_set_list()
+    return wds_universe, sets_universe
+
+
+def __getattr__(name):
+    # Lazy module attributes of the former import-time build (python >= 3.7)
+    if name == "corpus":
+        return get_corpus()
+    if name == "wds_universe":
+        return load_dataset()[0]
+    if name == "sets_universe":
+        return load_dataset()[1]
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+if __name__ == "__main__":
+    wds_universe, sets_universe = load_dataset()
+    print("Elements to cover: ", len(wds_universe))
+    print("Sets to choose from: ", len(sets_universe))